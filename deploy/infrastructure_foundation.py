@@ -4,11 +4,287 @@ Alibaba Cloud Infrastructure Foundation
 Complete IaC templates for VPC, security groups, and networking
 """
 
+import asyncio
+import hashlib
 import json
-from typing import Dict, List, Any
-from dataclasses import dataclass, asdict
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Any, Tuple
+from dataclasses import dataclass, field, fields
+from functools import cached_property, lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding
+    orjson = None
+
+# Slotted dataclasses need Python 3.10+; plain dataclasses are used on older interpreters
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Bump when the generated Terraform layout changes to invalidate cached outputs
+SCHEMA_VERSION = "4"
+CACHE_DIR = Path(".cache") / "infra"
+
+# Static HCL blocks; _TF_HEADER and the *_TMPL strings are str.format templates
+_TF_HEADER = """
+# Alibaba Cloud Infrastructure Foundation
+# Generated for {project_name} - {environment} environment
+
+terraform {{
+  required_providers {{
+    alicloud = {{
+      source  = "aliyun/alicloud"
+      version = "~> 1.190.0"
+    }}
+  }}
+}}
+
+# Configure Alibaba Cloud Provider
+provider "alicloud" {{
+  region = "{region}"
+}}
+
+# Variables
+variable "environment" {{
+  description = "Environment name"
+  type        = string
+  default     = "{environment}"
+}}
+
+variable "project_name" {{
+  description = "Project name"
+  type        = string
+  default     = "{project_name}"
+}}
+
+# Data sources
+data "alicloud_zones" "available" {{
+  available_resource_creation = "VSwitch"
+}}
+
+# VPC
+resource "alicloud_vpc" "main" {{
+  vpc_name   = "{vpc_name}"
+  cidr_block = "{vpc_cidr_block}"
+  
+  tags = {{
+    Name        = "{vpc_name}"
+    Environment = var.environment
+    Project     = var.project_name
+    Description = "{vpc_description}"
+  }}
+}}
+
+# Internet Gateway
+resource "alicloud_nat_gateway" "main" {{
+  vpc_id               = alicloud_vpc.main.id
+  nat_gateway_name     = "${{var.project_name}}-nat-gateway-${{var.environment}}"
+  payment_type         = "PayAsYouGo"
+  vswitch_id          = alicloud_vswitch.{nat_vswitch_tf_id}.id
+  nat_type            = "Enhanced"
+  
+  tags = {{
+    Name        = "${{var.project_name}}-nat-gateway-${{var.environment}}"
+    Environment = var.environment
+    Project     = var.project_name
+  }}
+}}
+
+# Elastic IP for NAT Gateway
+resource "alicloud_eip_address" "nat_gateway" {{
+  address_name         = "${{var.project_name}}-nat-eip-${{var.environment}}"
+  isp                 = "BGP"
+  internet_charge_type = "PayByBandwidth"
+  bandwidth           = "100"
+  
+  tags = {{
+    Name        = "${{var.project_name}}-nat-eip-${{var.environment}}"
+    Environment = var.environment
+    Project     = var.project_name
+  }}
+}}
+
+# Associate EIP with NAT Gateway
+resource "alicloud_eip_association" "nat_gateway" {{
+  allocation_id = alicloud_eip_address.nat_gateway.id
+  instance_id   = alicloud_nat_gateway.main.id
+}}
+
+# Subnets
+"""
+
+_ROUTE_TABLE_BLOCK = """
+# Route Table for Private Subnets
+resource "alicloud_route_table" "private" {
+  vpc_id           = alicloud_vpc.main.id
+  route_table_name = "${var.project_name}-private-rt-${var.environment}"
+  description      = "Route table for private subnets"
+  
+  tags = {
+    Name        = "${var.project_name}-private-rt-${var.environment}"
+    Environment = var.environment
+    Project     = var.project_name
+  }
+}
+
+# Route for private subnets to NAT Gateway
+resource "alicloud_route_entry" "private_nat" {
+  route_table_id        = alicloud_route_table.private.id
+  destination_cidrblock = "0.0.0.0/0"
+  nexthop_type         = "NatGateway"
+  nexthop_id           = alicloud_nat_gateway.main.id
+}
+
+# Associate private subnets with route table
+"""
+
+_NETWORK_ACL_BLOCK = """
+# Network ACL for database subnets
+resource "alicloud_network_acl" "database" {
+  vpc_id           = alicloud_vpc.main.id
+  network_acl_name = "${var.project_name}-db-nacl-${var.environment}"
+  description      = "Network ACL for database subnets"
+  
+  tags = {
+    Name        = "${var.project_name}-db-nacl-${var.environment}"
+    Environment = var.environment
+    Project     = var.project_name
+  }
+}
+
+# Database NACL Rules
+resource "alicloud_network_acl_entries" "database" {
+  network_acl_id = alicloud_network_acl.database.id
+  
+"""
 
-@dataclass
+_NETWORK_ACL_INGRESS_TMPL = """  ingress {{
+    protocol         = "tcp"
+    rule_action      = "accept"
+    port             = "{port}"
+    source_cidr_ip   = "{cidr}"
+    description      = "{description}"
+    priority         = {priority}
+  }}
+  
+"""
+
+_NETWORK_ACL_EGRESS_BLOCK = """  egress {
+    protocol         = "all"
+    rule_action      = "accept"
+    port             = "-1/-1"
+    destination_cidr_ip = "0.0.0.0/0"
+    description      = "Allow all outbound"
+    priority         = 1
+  }
+}
+
+# Associate NACL with database subnets
+"""
+
+_NETWORK_ACL_ATTACHMENT_TMPL = """resource "alicloud_network_acl_attachment" "{name}" {{
+  network_acl_id = alicloud_network_acl.database.id
+  resource_id    = alicloud_vswitch.{subnet_tf_id}.id
+  resource_type  = "VSwitch"
+}}
+"""
+
+_VPC_OUTPUTS_BLOCK = """
+# Outputs
+output "vpc_id" {
+  description = "ID of the VPC"
+  value       = alicloud_vpc.main.id
+}
+
+output "vpc_cidr_block" {
+  description = "CIDR block of the VPC"
+  value       = alicloud_vpc.main.cidr_block
+}
+"""
+
+_SUBNET_IDS_OUTPUT_TMPL = """
+output "{name}" {{
+  description = "{description}"
+  value = [
+{subnet_ids}
+  ]
+}}
+"""
+
+_SECURITY_GROUPS_OUTPUT_HEAD = """
+output "security_group_ids" {
+  description = "IDs of security groups"
+  value = {
+"""
+
+_TF_FOOTER = """  }
+}
+
+output "nat_gateway_id" {
+  description = "ID of the NAT Gateway"
+  value       = alicloud_nat_gateway.main.id
+}
+
+output "nat_gateway_eip" {
+  description = "Public IP of the NAT Gateway"
+  value       = alicloud_eip_address.nat_gateway.ip_address
+}
+"""
+
+_SUBNET_TMPL = """
+resource "alicloud_vswitch" "{tf_id}" {{
+  vpc_id       = alicloud_vpc.main.id
+  cidr_block   = "{cidr_block}"
+  zone_id      = "{zone_id}"
+  vswitch_name = "{name}"
+  
+  tags = {{
+    Name        = "{name}"
+    Environment = var.environment
+    Project     = var.project_name
+    Type        = "{type}"
+    Description = "{description}"
+  }}
+}}
+"""
+
+_ROUTE_TABLE_ATTACHMENT_TMPL = """resource "alicloud_route_table_attachment" "{name}" {{
+  vswitch_id     = alicloud_vswitch.{subnet_tf_id}.id
+  route_table_id = alicloud_route_table.private.id
+}}
+"""
+
+_SNAT_ENTRY_TMPL = """resource "alicloud_snat_entry" "{name}" {{
+  depends_on        = [alicloud_eip_association.nat_gateway]
+  snat_table_id     = alicloud_nat_gateway.main.snat_table_ids
+  source_vswitch_id = alicloud_vswitch.{subnet_tf_id}.id
+  snat_ip          = alicloud_eip_address.nat_gateway.ip_address
+}}
+"""
+
+_SECURITY_GROUP_TMPL = """
+resource "alicloud_security_group" "{tf_id}" {{
+  name        = "{name}"
+  description = "{description}"
+  vpc_id      = alicloud_vpc.main.id
+  
+  tags = {{
+    Name        = "{name}"
+    Environment = var.environment
+    Project     = var.project_name
+  }}
+}}
+"""
+
+def _dumps_indented(obj: Any) -> str:
+    """Serialize to two-space indented JSON, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+@dataclass(**_DATACLASS_OPTIONS)
 class SubnetConfig:
     """Subnet configuration"""
     name: str
@@ -16,8 +292,16 @@ class SubnetConfig:
     zone_id: str
     type: str  # public, private
     description: str
+    tf_id: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Terraform-safe resource identifier, computed once
+        self.tf_id = self.name.replace("-", "_")
 
-@dataclass
+# Field names substituted into _SUBNET_TMPL, looked up once rather than per subnet
+_SUBNET_FIELDS = tuple(f.name for f in fields(SubnetConfig))
+
+@dataclass(**_DATACLASS_OPTIONS)
 class VPCConfig:
     """VPC configuration"""
     name: str
@@ -27,7 +311,7 @@ class VPCConfig:
     enable_dns: bool = True
     enable_dns_hostnames: bool = True
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class SecurityGroupRule:
     """Security group rule"""
     type: str  # ingress/egress
@@ -37,21 +321,45 @@ class SecurityGroupRule:
     description: str
     priority: int = 1
 
-@dataclass
+@lru_cache(maxsize=256)
+def _rule_attributes(rule: SecurityGroupRule) -> Dict[str, Any]:
+    """Terraform attributes for a rule, shared by identical rules across security groups"""
+    return {
+        "type": rule.type,
+        "ip_protocol": rule.protocol,
+        "port_range": rule.port_range,
+        "cidr_ip": rule.source_cidr,
+        "description": rule.description,
+        "priority": rule.priority
+    }
+
+@dataclass(**_DATACLASS_OPTIONS)
 class SecurityGroupConfig:
     """Security group configuration"""
     name: str
     description: str
     rules: List[SecurityGroupRule]
+    tf_id: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Terraform-safe resource identifier, computed once
+        self.tf_id = self.name.replace("-", "_")
 
 class InfrastructureFoundationGenerator:
     """Generate complete infrastructure foundation"""
     
     def __init__(self, environment: str = "production", region: str = "cn-hangzhou"):
-        self.environment = environment
-        self.region = region
+        # Interned: these are formatted into nearly every resource name and tag
+        self.environment = sys.intern(environment)
+        self.region = sys.intern(region)
         self.project_name = "bailian-demo"
         
+    def cache_key(self) -> str:
+        """Key identifying the generated Terraform for the current inputs"""
+        source_digest = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).hexdigest()
+        raw = f"{self.environment}|{self.region}|{self.project_name}|{SCHEMA_VERSION}|{source_digest}"
+        return hashlib.blake2b(raw.encode()).hexdigest()
+    
     def create_vpc_config(self) -> VPCConfig:
         """Create VPC configuration with multi-AZ subnets"""
         subnets = [
@@ -165,349 +473,361 @@ class InfrastructureFoundationGenerator:
         
         return [alb_sg, app_sg, db_sg, bastion_sg]
     
+    def private_subnet_attachments(self, vpc_config: VPCConfig) -> Dict[str, str]:
+        """Map route table attachment names to private subnet identifiers"""
+        # e.g. "bailian-demo-private-app-subnet-a" -> "private_app_a"
+        prefix_len = len(self.project_name) + 1
+        return {
+            subnet.name[prefix_len:].replace("-subnet", "").replace("-", "_"): subnet.tf_id
+            for subnet in vpc_config.subnets if subnet.type == "private"
+        }
+    
+    def snat_subnet_attachments(self, private_subnets: Dict[str, str]) -> Dict[str, str]:
+        """Private application subnets that reach the internet through the NAT gateway's SNAT entries"""
+        return {name: subnet_tf_id for name, subnet_tf_id in private_subnets.items() if name.startswith("private_app")}
+    
+    def subnet_tiers(self, vpc_config: VPCConfig) -> Dict[str, List[SubnetConfig]]:
+        """Group subnets by tier: "public", "private-app" and "private-db" """
+        # e.g. "bailian-demo-private-app-subnet-a" -> "private-app"
+        prefix_len = len(self.project_name) + 1
+        tiers: Dict[str, List[SubnetConfig]] = {}
+        for subnet in vpc_config.subnets:
+            tiers.setdefault(subnet.name[prefix_len:].rpartition("-subnet-")[0], []).append(subnet)
+        return tiers
+    
+    def database_acl_ingress(self, app_subnets: List[SubnetConfig]) -> List[Tuple[str, str, str]]:
+        """Database ACL ingress rules as (port, source CIDR, description): MySQL, then Redis, from each app subnet"""
+        return [
+            (port, subnet.cidr_block, f"{service} from app subnet {subnet.name[-1].upper()}")
+            for port, service in (("3306/3306", "MySQL"), ("6379/6379", "Redis"))
+            for subnet in app_subnets
+        ]
+    
+    def security_group_rules_map(self, security_groups: List[SecurityGroupConfig]) -> Dict[str, Dict[str, Any]]:
+        """Flatten all security group rules into a for_each map keyed by rule name"""
+        return {
+            f"{sg.tf_id}_rule_{i}": {"security_group": sg.tf_id, **_rule_attributes(rule)}
+            for sg in security_groups
+            for i, rule in enumerate(sg.rules)
+        }
+    
     def generate_terraform_config(self) -> str:
         """Generate complete Terraform configuration"""
+        return self.terraform_config
+    
+    @cached_property
+    def terraform_config(self) -> str:
+        """Terraform configuration, rendered once per generator instance"""
+        return "".join(self._iter_tf_chunks())
+    
+    def _iter_tf_chunks(self) -> Iterator[str]:
+        """Yield the Terraform configuration chunk by chunk"""
         vpc_config = self.create_vpc_config()
         security_groups = self.create_security_groups()
+        tiers = self.subnet_tiers(vpc_config)
         
-        terraform_config = f"""
-# Alibaba Cloud Infrastructure Foundation
-# Generated for {self.project_name} - {self.environment} environment
-
-terraform {{
-  required_providers {{
-    alicloud = {{
-      source  = "aliyun/alicloud"
-      version = "~> 1.190.0"
-    }}
-  }}
-}}
-
-# Configure Alibaba Cloud Provider
-provider "alicloud" {{
-  region = "{self.region}"
-}}
-
-# Variables
-variable "environment" {{
-  description = "Environment name"
-  type        = string
-  default     = "{self.environment}"
-}}
-
-variable "project_name" {{
-  description = "Project name"
-  type        = string
-  default     = "{self.project_name}"
-}}
-
-# Data sources
-data "alicloud_zones" "available" {{
-  available_resource_creation = "VSwitch"
-}}
-
-# VPC
-resource "alicloud_vpc" "main" {{
-  vpc_name   = "{vpc_config.name}"
-  cidr_block = "{vpc_config.cidr_block}"
-  
-  tags = {{
-    Name        = "{vpc_config.name}"
-    Environment = var.environment
-    Project     = var.project_name
-    Description = "{vpc_config.description}"
-  }}
-}}
-
-# Internet Gateway
-resource "alicloud_nat_gateway" "main" {{
-  vpc_id               = alicloud_vpc.main.id
-  nat_gateway_name     = "${{var.project_name}}-nat-gateway-${{var.environment}}"
-  payment_type         = "PayAsYouGo"
-  vswitch_id          = alicloud_vswitch.public_a.id
-  nat_type            = "Enhanced"
-  
-  tags = {{
-    Name        = "${{var.project_name}}-nat-gateway-${{var.environment}}"
-    Environment = var.environment
-    Project     = var.project_name
-  }}
-}}
-
-# Elastic IP for NAT Gateway
-resource "alicloud_eip_address" "nat_gateway" {{
-  address_name         = "${{var.project_name}}-nat-eip-${{var.environment}}"
-  isp                 = "BGP"
-  internet_charge_type = "PayByBandwidth"
-  bandwidth           = "100"
-  
-  tags = {{
-    Name        = "${{var.project_name}}-nat-eip-${{var.environment}}"
-    Environment = var.environment
-    Project     = var.project_name
-  }}
-}}
-
-# Associate EIP with NAT Gateway
-resource "alicloud_eip_association" "nat_gateway" {{
-  allocation_id = alicloud_eip_address.nat_gateway.id
-  instance_id   = alicloud_nat_gateway.main.id
-}}
-
-# Subnets
-"""
+        yield _TF_HEADER.format(
+            project_name=self.project_name,
+            environment=self.environment,
+            region=self.region,
+            vpc_name=vpc_config.name,
+            vpc_cidr_block=vpc_config.cidr_block,
+            vpc_description=vpc_config.description,
+            nat_vswitch_tf_id=tiers["public"][0].tf_id
+        )
         
         # Generate subnets
-        for subnet in vpc_config.subnets:
-            subnet_name_tf = subnet.name.replace("-", "_")
-            terraform_config += f"""
-resource "alicloud_vswitch" "{subnet_name_tf}" {{
-  vpc_id       = alicloud_vpc.main.id
-  cidr_block   = "{subnet.cidr_block}"
-  zone_id      = "{subnet.zone_id}"
-  vswitch_name = "{subnet.name}"
-  
-  tags = {{
-    Name        = "{subnet.name}"
-    Environment = var.environment
-    Project     = var.project_name
-    Type        = "{subnet.type}"
-    Description = "{subnet.description}"
-  }}
-}}
-"""
+        yield "".join(
+            _SUBNET_TMPL.format_map({name: getattr(subnet, name) for name in _SUBNET_FIELDS})
+            for subnet in vpc_config.subnets
+        )
         
         # Route tables for private subnets
-        terraform_config += """
-# Route Table for Private Subnets
-resource "alicloud_route_table" "private" {
-  vpc_id           = alicloud_vpc.main.id
-  route_table_name = "${var.project_name}-private-rt-${var.environment}"
-  description      = "Route table for private subnets"
-  
-  tags = {
-    Name        = "${var.project_name}-private-rt-${var.environment}"
-    Environment = var.environment
-    Project     = var.project_name
-  }
-}
-
-# Route for private subnets to NAT Gateway
-resource "alicloud_route_entry" "private_nat" {
-  route_table_id        = alicloud_route_table.private.id
-  destination_cidrblock = "0.0.0.0/0"
-  nexthop_type         = "NatGateway"
-  nexthop_id           = alicloud_nat_gateway.main.id
-}
-
-# Associate private subnets with route table
-resource "alicloud_route_table_attachment" "private_app_a" {
-  vswitch_id     = alicloud_vswitch.bailian_demo_private_app_subnet_a.id
-  route_table_id = alicloud_route_table.private.id
-}
-
-resource "alicloud_route_table_attachment" "private_app_b" {
-  vswitch_id     = alicloud_vswitch.bailian_demo_private_app_subnet_b.id
-  route_table_id = alicloud_route_table.private.id
-}
-
-resource "alicloud_route_table_attachment" "private_db_a" {
-  vswitch_id     = alicloud_vswitch.bailian_demo_private_db_subnet_a.id
-  route_table_id = alicloud_route_table.private.id
-}
-
-resource "alicloud_route_table_attachment" "private_db_b" {
-  vswitch_id     = alicloud_vswitch.bailian_demo_private_db_subnet_b.id
-  route_table_id = alicloud_route_table.private.id
-}
-
-# SNAT entries for private subnets
-resource "alicloud_snat_entry" "private_app_a" {
-  depends_on        = [alicloud_eip_association.nat_gateway]
-  snat_table_id     = alicloud_nat_gateway.main.snat_table_ids
-  source_vswitch_id = alicloud_vswitch.bailian_demo_private_app_subnet_a.id
-  snat_ip          = alicloud_eip_address.nat_gateway.ip_address
-}
-
-resource "alicloud_snat_entry" "private_app_b" {
-  depends_on        = [alicloud_eip_association.nat_gateway]
-  snat_table_id     = alicloud_nat_gateway.main.snat_table_ids
-  source_vswitch_id = alicloud_vswitch.bailian_demo_private_app_subnet_b.id
-  snat_ip          = alicloud_eip_address.nat_gateway.ip_address
-}
-
+        yield _ROUTE_TABLE_BLOCK
+        private_subnets = self.private_subnet_attachments(vpc_config)
+        yield "\n".join(
+            _ROUTE_TABLE_ATTACHMENT_TMPL.format(name=name, subnet_tf_id=subnet_tf_id)
+            for name, subnet_tf_id in private_subnets.items()
+        )
+        yield "\n# SNAT entries for private subnets\n"
+        yield "\n".join(
+            _SNAT_ENTRY_TMPL.format(name=name, subnet_tf_id=subnet_tf_id)
+            for name, subnet_tf_id in self.snat_subnet_attachments(private_subnets).items()
+        )
+        yield """
 # Security Groups
 """
         
         # Generate security groups
-        for sg in security_groups:
-            sg_name_tf = sg.name.replace("-", "_")
-            terraform_config += f"""
-resource "alicloud_security_group" "{sg_name_tf}" {{
-  name        = "{sg.name}"
-  description = "{sg.description}"
-  vpc_id      = alicloud_vpc.main.id
-  
-  tags = {{
-    Name        = "{sg.name}"
-    Environment = var.environment
-    Project     = var.project_name
-  }}
-}}
-"""
-            
-            # Generate security group rules
-            for i, rule in enumerate(sg.rules):
-                rule_name = f"{sg_name_tf}_rule_{i}"
-                terraform_config += f"""
-resource "alicloud_security_group_rule" "{rule_name}" {{
-  type              = "{rule.type}"
-  ip_protocol       = "{rule.protocol}"
-  port_range        = "{rule.port_range}"
-  security_group_id = alicloud_security_group.{sg_name_tf}.id
-  cidr_ip          = "{rule.source_cidr}"
-  description      = "{rule.description}"
-  priority         = {rule.priority}
-}}
-"""
+        yield "".join(
+            _SECURITY_GROUP_TMPL.format(tf_id=sg.tf_id, name=sg.name, description=sg.description)
+            for sg in security_groups
+        )
         
-        # Network ACLs for additional security
-        terraform_config += f"""
-# Network ACL for database subnets
-resource "alicloud_network_acl" "database" {{
-  vpc_id           = alicloud_vpc.main.id
-  network_acl_name = "${{var.project_name}}-db-nacl-${{var.environment}}"
-  description      = "Network ACL for database subnets"
-  
-  tags = {{
-    Name        = "${{var.project_name}}-db-nacl-${{var.environment}}"
-    Environment = var.environment
-    Project     = var.project_name
-  }}
-}}
-
-# Database NACL Rules
-resource "alicloud_network_acl_entries" "database" {{
-  network_acl_id = alicloud_network_acl.database.id
-  
-  ingress {{
-    protocol         = "tcp"
-    rule_action      = "accept"
-    port             = "3306/3306"
-    source_cidr_ip   = "10.0.11.0/24"
-    description      = "MySQL from app subnet A"
-    priority         = 1
-  }}
-  
-  ingress {{
-    protocol         = "tcp"
-    rule_action      = "accept"
-    port             = "3306/3306"
-    source_cidr_ip   = "10.0.12.0/24"
-    description      = "MySQL from app subnet B"
-    priority         = 2
-  }}
-  
-  ingress {{
-    protocol         = "tcp"
-    rule_action      = "accept"
-    port             = "6379/6379"
-    source_cidr_ip   = "10.0.11.0/24"
-    description      = "Redis from app subnet A"
-    priority         = 3
-  }}
-  
-  ingress {{
-    protocol         = "tcp"
-    rule_action      = "accept"
-    port             = "6379/6379"
-    source_cidr_ip   = "10.0.12.0/24"
-    description      = "Redis from app subnet B"
-    priority         = 4
+        # Generate all security group rules as a single for_each resource
+        security_group_ids = "\n".join(
+            f'    {sg.tf_id} = alicloud_security_group.{sg.tf_id}.id'
+            for sg in security_groups
+        )
+        security_group_rules = _dumps_indented(self.security_group_rules_map(security_groups)).replace("\n", "\n  ")
+        yield f"""
+# Security Group Rules
+locals {{
+  security_group_ids = {{
+{security_group_ids}
   }}
   
-  egress {{
-    protocol         = "all"
-    rule_action      = "accept"
-    port             = "-1/-1"
-    destination_cidr_ip = "0.0.0.0/0"
-    description      = "Allow all outbound"
-    priority         = 1
-  }}
-}}
-
-# Associate NACL with database subnets
-resource "alicloud_network_acl_attachment" "db_subnet_a" {{
-  network_acl_id = alicloud_network_acl.database.id
-  resource_id    = alicloud_vswitch.bailian_demo_private_db_subnet_a.id
-  resource_type  = "VSwitch"
-}}
-
-resource "alicloud_network_acl_attachment" "db_subnet_b" {{
-  network_acl_id = alicloud_network_acl.database.id
-  resource_id    = alicloud_vswitch.bailian_demo_private_db_subnet_b.id
-  resource_type  = "VSwitch"
+  security_group_rules = {security_group_rules}
 }}
 
-# Outputs
-output "vpc_id" {{
-  description = "ID of the VPC"
-  value       = alicloud_vpc.main.id
-}}
-
-output "vpc_cidr_block" {{
-  description = "CIDR block of the VPC"
-  value       = alicloud_vpc.main.cidr_block
-}}
-
-output "public_subnet_ids" {{
-  description = "IDs of public subnets"
-  value = [
-    alicloud_vswitch.bailian_demo_public_subnet_a.id,
-    alicloud_vswitch.bailian_demo_public_subnet_b.id
-  ]
-}}
-
-output "private_app_subnet_ids" {{
-  description = "IDs of private application subnets"
-  value = [
-    alicloud_vswitch.bailian_demo_private_app_subnet_a.id,  
-    alicloud_vswitch.bailian_demo_private_app_subnet_b.id
-  ]
-}}
-
-output "private_db_subnet_ids" {{
-  description = "IDs of private database subnets"
-  value = [
-    alicloud_vswitch.bailian_demo_private_db_subnet_a.id,
-    alicloud_vswitch.bailian_demo_private_db_subnet_b.id
-  ]
+resource "alicloud_security_group_rule" "all" {{
+  for_each = local.security_group_rules
+  
+  type              = each.value.type
+  ip_protocol       = each.value.ip_protocol
+  port_range        = each.value.port_range
+  security_group_id = local.security_group_ids[each.value.security_group]
+  cidr_ip          = each.value.cidr_ip
+  description      = each.value.description
+  priority         = each.value.priority
 }}
-
-output "security_group_ids" {{
-  description = "IDs of security groups"
-  value = {{
 """
         
-        for sg in security_groups:
-            sg_name_tf = sg.name.replace("-", "_")
-            terraform_config += f'    "{sg.name}" = alicloud_security_group.{sg_name_tf}.id\n'
+        # Network ACLs for additional security
+        yield _NETWORK_ACL_BLOCK
+        yield "".join(
+            _NETWORK_ACL_INGRESS_TMPL.format(port=port, cidr=cidr, description=description, priority=priority)
+            for priority, (port, cidr, description) in enumerate(self.database_acl_ingress(tiers["private-app"]),
+                                                                 start=1)
+        )
+        yield _NETWORK_ACL_EGRESS_BLOCK
+        yield "\n".join(
+            _NETWORK_ACL_ATTACHMENT_TMPL.format(name=f"db_subnet_{subnet.name[-1]}", subnet_tf_id=subnet.tf_id)
+            for subnet in tiers["private-db"]
+        )
         
-        terraform_config += """  }
-}
-
-output "nat_gateway_id" {
-  description = "ID of the NAT Gateway"
-  value       = alicloud_nat_gateway.main.id
-}
-
-output "nat_gateway_eip" {
-  description = "Public IP of the NAT Gateway"
-  value       = alicloud_eip_address.nat_gateway.ip_address
-}
-"""
+        yield _VPC_OUTPUTS_BLOCK
+        for kind, description in (("public", "IDs of public subnets"),
+                                  ("private-app", "IDs of private application subnets"),
+                                  ("private-db", "IDs of private database subnets")):
+            yield _SUBNET_IDS_OUTPUT_TMPL.format(
+                name=f"{kind.replace('-', '_')}_subnet_ids",
+                description=description,
+                subnet_ids=",\n".join(f"    alicloud_vswitch.{subnet.tf_id}.id"
+                                      for subnet in tiers[kind])
+            )
+        
+        yield _SECURITY_GROUPS_OUTPUT_HEAD
+        yield "".join(f'    "{sg.name}" = alicloud_security_group.{sg.tf_id}.id\n' for sg in security_groups)
+        
+        yield _TF_FOOTER
+    
+    def generate_terraform_json(self) -> Dict[str, Any]:
+        """Generate the Terraform configuration as a JSON syntax (.tf.json) tree"""
+        vpc_config = self.create_vpc_config()
+        security_groups = self.create_security_groups()
         
-        return terraform_config
+        def tags(name: str, **extra: str) -> Dict[str, str]:
+            return {"Name": name, "Environment": "${var.environment}", "Project": "${var.project_name}", **extra}
+        
+        tiers = self.subnet_tiers(vpc_config)
+        
+        def subnet_ids(kind: str) -> List[str]:
+            return [f"${{alicloud_vswitch.{subnet.tf_id}.id}}" for subnet in tiers[kind]]
+        
+        private_subnets = self.private_subnet_attachments(vpc_config)
+        
+        resources: Dict[str, Dict[str, Any]] = {
+            "alicloud_vpc": {
+                "main": {
+                    "vpc_name": vpc_config.name,
+                    "cidr_block": vpc_config.cidr_block,
+                    "tags": tags(vpc_config.name, Description=vpc_config.description)
+                }
+            },
+            "alicloud_nat_gateway": {
+                "main": {
+                    "vpc_id": "${alicloud_vpc.main.id}",
+                    "nat_gateway_name": "${var.project_name}-nat-gateway-${var.environment}",
+                    "payment_type": "PayAsYouGo",
+                    # The NAT gateway sits in the first public subnet
+                    "vswitch_id": f"${{alicloud_vswitch.{tiers['public'][0].tf_id}.id}}",
+                    "nat_type": "Enhanced",
+                    "tags": tags("${var.project_name}-nat-gateway-${var.environment}")
+                }
+            },
+            "alicloud_eip_address": {
+                "nat_gateway": {
+                    "address_name": "${var.project_name}-nat-eip-${var.environment}",
+                    "isp": "BGP",
+                    "internet_charge_type": "PayByBandwidth",
+                    "bandwidth": "100",
+                    "tags": tags("${var.project_name}-nat-eip-${var.environment}")
+                }
+            },
+            "alicloud_eip_association": {
+                "nat_gateway": {
+                    "allocation_id": "${alicloud_eip_address.nat_gateway.id}",
+                    "instance_id": "${alicloud_nat_gateway.main.id}"
+                }
+            },
+            "alicloud_vswitch": {
+                subnet.tf_id: {
+                    "vpc_id": "${alicloud_vpc.main.id}",
+                    "cidr_block": subnet.cidr_block,
+                    "zone_id": subnet.zone_id,
+                    "vswitch_name": subnet.name,
+                    "tags": tags(subnet.name, Type=subnet.type, Description=subnet.description)
+                }
+                for subnet in vpc_config.subnets
+            },
+            "alicloud_route_table": {
+                "private": {
+                    "vpc_id": "${alicloud_vpc.main.id}",
+                    "route_table_name": "${var.project_name}-private-rt-${var.environment}",
+                    "description": "Route table for private subnets",
+                    "tags": tags("${var.project_name}-private-rt-${var.environment}")
+                }
+            },
+            "alicloud_route_entry": {
+                "private_nat": {
+                    "route_table_id": "${alicloud_route_table.private.id}",
+                    "destination_cidrblock": "0.0.0.0/0",
+                    "nexthop_type": "NatGateway",
+                    "nexthop_id": "${alicloud_nat_gateway.main.id}"
+                }
+            },
+            "alicloud_route_table_attachment": {
+                attachment_name: {
+                    "vswitch_id": f"${{alicloud_vswitch.{subnet_tf}.id}}",
+                    "route_table_id": "${alicloud_route_table.private.id}"
+                }
+                for attachment_name, subnet_tf in private_subnets.items()
+            },
+            "alicloud_snat_entry": {
+                attachment_name: {
+                    "depends_on": ["alicloud_eip_association.nat_gateway"],
+                    "snat_table_id": "${alicloud_nat_gateway.main.snat_table_ids}",
+                    "source_vswitch_id": f"${{alicloud_vswitch.{subnet_tf}.id}}",
+                    "snat_ip": "${alicloud_eip_address.nat_gateway.ip_address}"
+                }
+                for attachment_name, subnet_tf in self.snat_subnet_attachments(private_subnets).items()
+            },
+            "alicloud_security_group": {
+                sg.tf_id: {
+                    "name": sg.name,
+                    "description": sg.description,
+                    "vpc_id": "${alicloud_vpc.main.id}",
+                    "tags": tags(sg.name)
+                }
+                for sg in security_groups
+            },
+            "alicloud_security_group_rule": {
+                "all": {
+                    "for_each": "${local.security_group_rules}",
+                    "type": "${each.value.type}",
+                    "ip_protocol": "${each.value.ip_protocol}",
+                    "port_range": "${each.value.port_range}",
+                    "security_group_id": "${local.security_group_ids[each.value.security_group]}",
+                    "cidr_ip": "${each.value.cidr_ip}",
+                    "description": "${each.value.description}",
+                    "priority": "${each.value.priority}"
+                }
+            },
+            "alicloud_network_acl": {
+                "database": {
+                    "vpc_id": "${alicloud_vpc.main.id}",
+                    "network_acl_name": "${var.project_name}-db-nacl-${var.environment}",
+                    "description": "Network ACL for database subnets",
+                    "tags": tags("${var.project_name}-db-nacl-${var.environment}")
+                }
+            },
+            "alicloud_network_acl_entries": {
+                "database": {
+                    "network_acl_id": "${alicloud_network_acl.database.id}",
+                    "ingress": [
+                        {
+                            "protocol": "tcp",
+                            "rule_action": "accept",
+                            "port": port,
+                            "source_cidr_ip": cidr,
+                            "description": description,
+                            "priority": priority
+                        }
+                        for priority, (port, cidr, description) in enumerate(
+                            self.database_acl_ingress(tiers["private-app"]), start=1)
+                    ],
+                    "egress": [
+                        {
+                            "protocol": "all",
+                            "rule_action": "accept",
+                            "port": "-1/-1",
+                            "destination_cidr_ip": "0.0.0.0/0",
+                            "description": "Allow all outbound",
+                            "priority": 1
+                        }
+                    ]
+                }
+            },
+            "alicloud_network_acl_attachment": {
+                f"db_subnet_{subnet.name[-1]}": {
+                    "network_acl_id": "${alicloud_network_acl.database.id}",
+                    "resource_id": f"${{alicloud_vswitch.{subnet.tf_id}.id}}",
+                    "resource_type": "VSwitch"
+                }
+                for subnet in tiers["private-db"]
+            }
+        }
+        
+        return {
+            "terraform": {
+                "required_providers": {
+                    "alicloud": {"source": "aliyun/alicloud", "version": "~> 1.190.0"}
+                }
+            },
+            "provider": {"alicloud": {"region": self.region}},
+            "variable": {
+                "environment": {"description": "Environment name", "type": "string", "default": self.environment},
+                "project_name": {"description": "Project name", "type": "string", "default": self.project_name}
+            },
+            "data": {"alicloud_zones": {"available": {"available_resource_creation": "VSwitch"}}},
+            "locals": {
+                "security_group_ids": {
+                    sg.tf_id: f"${{alicloud_security_group.{sg.tf_id}.id}}"
+                    for sg in security_groups
+                },
+                "security_group_rules": self.security_group_rules_map(security_groups)
+            },
+            "resource": resources,
+            "output": {
+                "vpc_id": {"description": "ID of the VPC", "value": "${alicloud_vpc.main.id}"},
+                "vpc_cidr_block": {"description": "CIDR block of the VPC", "value": "${alicloud_vpc.main.cidr_block}"},
+                "public_subnet_ids": {
+                    "description": "IDs of public subnets",
+                    "value": subnet_ids("public")
+                },
+                "private_app_subnet_ids": {
+                    "description": "IDs of private application subnets",
+                    "value": subnet_ids("private-app")
+                },
+                "private_db_subnet_ids": {
+                    "description": "IDs of private database subnets",
+                    "value": subnet_ids("private-db")
+                },
+                "security_group_ids": {
+                    "description": "IDs of security groups",
+                    "value": {
+                        sg.name: f"${{alicloud_security_group.{sg.tf_id}.id}}"
+                        for sg in security_groups
+                    }
+                },
+                "nat_gateway_id": {"description": "ID of the NAT Gateway", "value": "${alicloud_nat_gateway.main.id}"},
+                "nat_gateway_eip": {
+                    "description": "Public IP of the NAT Gateway",
+                    "value": "${alicloud_eip_address.nat_gateway.ip_address}"
+                }
+            }
+        }
     
     def generate_deployment_script(self) -> str:
         """Generate infrastructure deployment script"""
@@ -569,6 +889,45 @@ echo "- Network ACLs: 1"
 echo "🎉 Infrastructure foundation deployment completed successfully!"
 """
 
+def _write_chunks(path: str, chunks: Iterable[bytes]) -> None:
+    """Write encoded chunks with os.write, bypassing the text I/O layer"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for chunk in chunks:
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _write_terraform(generator: InfrastructureFoundationGenerator, terraform_file: str,
+                     cache_file: Path, output_format: str, cache_hit: bool) -> None:
+    """Write the Terraform configuration, reusing the cached copy when available"""
+    if cache_hit:
+        shutil.copy(cache_file, terraform_file)
+        return
+    
+    if output_format == "json":
+        _write_chunks(terraform_file, [_dumps_indented(generator.generate_terraform_json()).encode("utf-8")])
+    else:
+        _write_chunks(terraform_file, (chunk.encode("utf-8") for chunk in generator._iter_tf_chunks()))
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.copy(terraform_file, cache_file)
+
+def _write_deployment_script(generator: InfrastructureFoundationGenerator) -> None:
+    """Write the deployment script and make it executable"""
+    with open("deploy_infrastructure.sh", "w") as f:
+        f.write(generator.generate_deployment_script())
+    os.chmod("deploy_infrastructure.sh", 0o755)
+
+async def _write_outputs(generator: InfrastructureFoundationGenerator, terraform_file: str,
+                         cache_file: Path, output_format: str, cache_hit: bool) -> None:
+    """Write the independent output files concurrently"""
+    await asyncio.gather(
+        asyncio.to_thread(_write_terraform, generator, terraform_file, cache_file, output_format, cache_hit),
+        asyncio.to_thread(_write_deployment_script, generator)
+    )
+
 def main():
     """Generate infrastructure foundation configuration"""
     import argparse
@@ -576,28 +935,27 @@ def main():
     parser = argparse.ArgumentParser(description="Generate infrastructure foundation")
     parser.add_argument("--environment", default="production", help="Environment name")
     parser.add_argument("--region", default="cn-hangzhou", help="Alibaba Cloud region")
+    parser.add_argument("--format", choices=["hcl", "json"], default="hcl",
+                        help="Terraform syntax to emit (json writes infrastructure_terraform.tf.json)")
+    parser.add_argument("--no-cache", action="store_true", help="Regenerate Terraform even if a cached copy exists")
     
     args = parser.parse_args()
     
     generator = InfrastructureFoundationGenerator(args.environment, args.region)
+    suffix = ".tf.json" if args.format == "json" else ".tf"
+    terraform_file = f"infrastructure_terraform{suffix}"
+    cache_file = CACHE_DIR / f"{generator.cache_key()}{suffix}"
+    cache_hit = not args.no_cache and cache_file.exists()
     
-    # Generate configurations
-    terraform_config = generator.generate_terraform_config()
-    deployment_script = generator.generate_deployment_script()
-    
-    # Save configurations
-    with open("infrastructure_terraform.tf", "w") as f:
-        f.write(terraform_config)
+    # Terraform loads both main.tf and main.tf.json from a directory, so drop the other format's file
+    other_suffix = ".tf" if args.format == "json" else ".tf.json"
+    Path(f"infrastructure_terraform{other_suffix}").unlink(missing_ok=True)
     
-    with open("deploy_infrastructure.sh", "w") as f:
-        f.write(deployment_script)
-    
-    # Make deployment script executable
-    import os
-    os.chmod("deploy_infrastructure.sh", 0o755)
+    # Generate and save configurations (reuse cached Terraform when inputs are unchanged)
+    asyncio.run(_write_outputs(generator, terraform_file, cache_file, args.format, cache_hit))
     
     print("✅ Infrastructure foundation files generated:")
-    print("  - infrastructure_terraform.tf (Terraform configuration)")
+    print(f"  - {terraform_file} (Terraform configuration{', cached' if cache_hit else ''})")
     print("  - deploy_infrastructure.sh (Deployment script)")
     print(f"  - Environment: {args.environment}")
     print(f"  - Region: {args.region}")
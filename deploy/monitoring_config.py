@@ -5,11 +5,16 @@ Creates dashboards, alerts, and monitoring rules
 """
 
 import json
+import sys
 import yaml
-from typing import Dict, List, Any
-from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+from dataclasses import dataclass, field
 
-@dataclass
+# Slotted dataclasses need Python 3.10+; plain dataclasses are used on older interpreters
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class AlertRule:
     """Alert rule configuration"""
     rule_name: str
@@ -21,18 +26,20 @@ class AlertRule:
     evaluation_periods: int = 3
     period: int = 300  # 5 minutes
     statistics: str = "Average"  # Average, Maximum, Minimum
-    actions: List[str] = None
-    
-    def __post_init__(self):
-        if self.actions is None:
-            self.actions = []
+    actions: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Dashboard:
     """Dashboard configuration"""
     dashboard_name: str
     charts: List[Dict[str, Any]]
 
+@lru_cache(maxsize=128)
+def _encode_dimensions(items: Tuple[Tuple[str, str], ...]) -> str:
+    """Serialize alarm dimensions once per distinct dimension set"""
+    # Always the stdlib encoder: orjson's compact separators would make the generated .tf depend on what is installed
+    return json.dumps(dict(items))
+
 class MonitoringConfigGenerator:
     """Generate comprehensive monitoring configuration"""
     
@@ -177,7 +184,7 @@ resource "alicloud_cms_alarm" "{rule_name_tf}" {{
   name         = "{rule.rule_name}"
   project      = "{rule.namespace}"
   metric       = "{rule.metric_name}"
-  dimensions   = {json.dumps(rule.dimensions)}
+  dimensions   = {_encode_dimensions(tuple(rule.dimensions.items()))}
   statistics   = "{rule.statistics}"
   period       = {rule.period}
   operator     = "{rule.comparison_operator}"
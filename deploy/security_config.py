@@ -5,10 +5,195 @@ Includes: RAM roles, Security Center, WAF, SSL certificates, and security polici
 """
 
 import json
-import yaml
-from typing import Dict, List, Any
-from dataclasses import dataclass, asdict
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Sequence
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding
+    orjson = None
+
+# Slotted dataclasses need Python 3.10+; plain dataclasses are used on older interpreters
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+def _dumps_indented(obj: Any) -> str:
+    """Serialize to two-space indented JSON, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+def _service_assume_role_policy(service: str) -> Dict[str, Any]:
+    """Trust policy allowing an Alibaba Cloud service to assume a RAM role"""
+    return {
+        "Version": "1",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {
+                    "Service": [service]
+                },
+                "Action": ["sts:AssumeRole"]
+            }
+        ]
+    }
+
+# Static HCL blocks; _TF_HEADER and the *_TMPL strings are str.format templates
+_TF_HEADER = """
+# Alibaba Cloud Security Configuration
+# Generated for {project_name} - {environment} environment
+
+terraform {{
+  required_providers {{
+    alicloud = {{
+      source  = "aliyun/alicloud"
+      version = "~> 1.190.0"
+    }}
+  }}
+}}
+
+# Variables
+variable "environment" {{
+  description = "Environment name"
+  type        = string
+  default     = "{environment}"
+}}
+
+variable "project_name" {{
+  description = "Project name"
+  type        = string
+  default     = "{project_name}"
+}}
+
+variable "domain" {{
+  description = "Domain name for SSL and WAF"
+  type        = string
+  default     = "{domain}"
+}}
+
+# Data sources
+data "alicloud_vpcs" "default" {{
+  name_regex = "default"
+}}
+
+# RAM Roles
+"""
+
+_WAF_BLOCK = """
+# Web Application Firewall
+resource "alicloud_waf_instance" "main" {
+  big_screen      = "0"
+  exclusive_ip    = "0"
+  ext_bandwidth   = "50"
+  ext_domain_package = "1"
+  package_code    = "version_3"
+  prefessional_service = "false"
+  subscription_type = "Subscription"
+  waf_log         = "true"
+  log_storage     = "3"
+  log_time        = "180"
+  
+  tags = {
+    Environment = var.environment
+    Project     = var.project_name
+  }
+}
+
+resource "alicloud_waf_domain" "main" {
+  domain_name   = var.domain
+  instance_id   = alicloud_waf_instance.main.id
+  is_access_product = "On"
+  source_ips    = ["1.1.1.1"]  # Replace with ALB IP
+  cluster_type  = "PhysicalCluster"
+  http2_port    = ["443"]
+  http_port     = ["80"]
+  https_port    = ["443"]
+  http_to_user_ip = "Off"
+  https_redirect  = "On"
+  load_balancing  = "IpHash"
+}
+
+# WAF Protection Rules
+resource "alicloud_waf_protection_module" "cc_protection" {
+  domain     = alicloud_waf_domain.main.domain_name
+  instance_id = alicloud_waf_instance.main.id
+  defense_type = "cc"
+  status     = 1
+}
+
+resource "alicloud_waf_protection_module" "web_attack" {
+  domain     = alicloud_waf_domain.main.domain_name
+  instance_id = alicloud_waf_instance.main.id
+  defense_type = "waf"
+  status     = 1
+}
+"""
+
+_SSL_CERTIFICATE_TMPL = """
+# SSL Certificate
+resource "alicloud_ssl_certificates_service_certificate" "main" {{
+  certificate_name = "{project_name}-ssl-{environment}"
+  cert             = file("path/to/certificate.crt")
+  key              = file("path/to/private.key")
+}}
+"""
+
+_SECURITY_CENTER_TMPL = """
+# Security Center (Cloud Security Center)
+resource "alicloud_threat_detection_baseline_strategy" "main" {{
+  baseline_strategy_name = "{project_name}-baseline-{environment}"
+  custom_type           = "custom"
+  end_time             = "08:00:00"
+  start_time           = "02:00:00"
+  target_type          = "groupId"
+  cycle_days           = 3
+  cycle_start_time     = 3
+}}
+
+resource "alicloud_threat_detection_anti_brute_force_rule" "main" {{
+  name            = "{project_name}-anti-brute-force"
+  forbidden_time  = 360
+  fail_count      = 5
+  span            = 60
+  default_rule    = false
+  
+  uuid_list = ["all"]  # Apply to all assets
+}}
+"""
+
+_RAM_ROLES_OUTPUT_HEAD = """
+# Outputs
+output "ram_roles" {
+  description = "Created RAM roles"
+  value = {
+"""
+
+_SECURITY_GROUPS_OUTPUT_HEAD = """  }
+}
+
+output "security_groups" {
+  description = "Created security groups"
+  value = {
+"""
+
+_TF_FOOTER = """  }
+}
+
+output "waf_instance_id" {
+  description = "WAF instance ID"
+  value       = alicloud_waf_instance.main.id
+}
+
+output "ssl_certificate_id" {
+  description = "SSL certificate ID"
+  value       = alicloud_ssl_certificates_service_certificate.main.id
+}
+"""
 
 class SecurityLevel(Enum):
     """Security configuration levels"""
@@ -16,43 +201,60 @@ class SecurityLevel(Enum):
     STANDARD = "standard"
     ENTERPRISE = "enterprise"
 
-@dataclass
 class RAMRoleConfig:
     """RAM role configuration"""
-    role_name: str
-    description: str
-    assume_role_policy: Dict[str, Any]
-    policies: List[str]
-    tags: Dict[str, str] = None
+    __slots__ = _fields = ("role_name", "description", "assume_role_policy", "policies", "tags",
+                           "assume_role_policy_json", "tf_id")
     
-    def __post_init__(self):
-        if self.tags is None:
-            self.tags = {}
+    def __init__(self, role_name: str, description: str, assume_role_policy: Mapping[str, Any],
+                 policies: Sequence[str], tags: Optional[Dict[str, str]] = None,
+                 assume_role_policy_json: Optional[str] = None):
+        self.role_name = role_name
+        self.description = description
+        self.assume_role_policy = assume_role_policy
+        self.policies = policies
+        self.tags = {} if tags is None else tags
+        # Pre-serialized policy document; pass it in when the policy is a shared constant
+        if assume_role_policy_json is None:
+            assume_role_policy_json = _dumps_indented(dict(assume_role_policy))
+        self.assume_role_policy_json = assume_role_policy_json
+        # Terraform-safe resource identifier, computed once
+        self.tf_id = role_name.replace("-", "_")
+    
+    def __repr__(self) -> str:
+        return f"RAMRoleConfig({', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)})"
 
-@dataclass
 class SecurityGroupRule:
     """Security group rule configuration"""
-    direction: str  # ingress/egress
-    protocol: str   # tcp/udp/icmp/all
-    port_range: str
-    source_cidr: str
-    description: str
-    priority: int = 1
+    __slots__ = _fields = ("direction", "protocol", "port_range", "source_cidr", "description", "priority")
+    
+    def __init__(self, direction: str, protocol: str, port_range: str, source_cidr: str,
+                 description: str, priority: int = 1):
+        self.direction = direction  # ingress/egress
+        self.protocol = protocol  # tcp/udp/icmp/all
+        self.port_range = port_range
+        self.source_cidr = source_cidr
+        self.description = description
+        self.priority = priority
+    
+    def __repr__(self) -> str:
+        return f"SecurityGroupRule({', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)})"
 
-@dataclass 
+@dataclass(**_DATACLASS_OPTIONS)
 class SecurityGroupConfig:
     """Security group configuration"""
     name: str
     description: str
     vpc_id: str
     rules: List[SecurityGroupRule]
-    tags: Dict[str, str] = None
+    tags: Dict[str, str] = field(default_factory=dict)
+    tf_id: str = field(init=False, repr=False)
     
     def __post_init__(self):
-        if self.tags is None:
-            self.tags = {}
+        # Terraform-safe resource identifier, computed once
+        self.tf_id = self.name.replace("-", "_")
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class WAFConfig:
     """Web Application Firewall configuration"""
     instance_name: str
@@ -61,14 +263,10 @@ class WAFConfig:
     enable_log: bool = True
     enable_cc_protection: bool = True
     enable_region_block: bool = True
-    blocked_regions: List[str] = None
+    blocked_regions: List[str] = field(default_factory=list)
     rate_limit: int = 2000  # requests per 5 minutes
-    
-    def __post_init__(self):
-        if self.blocked_regions is None:
-            self.blocked_regions = []
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class SSLCertificateConfig:
     """SSL certificate configuration"""
     domain: str
@@ -76,12 +274,112 @@ class SSLCertificateConfig:
     auto_renew: bool = True
     certificate_type: str = "DV"  # DV/OV/EV
 
+@lru_cache(maxsize=4)
+def _security_policies(security_level: SecurityLevel) -> Dict[str, Any]:
+    """Build the security policies document for a security level"""
+    return {
+        "security_policies": {
+            "password_policy": {
+                "minimum_length": 12,
+                "require_uppercase": True,
+                "require_lowercase": True,
+                "require_numbers": True,
+                "require_symbols": True,
+                "password_expiry_days": 90,
+                "password_history": 12
+            },
+            "session_policy": {
+                "session_timeout": 3600,  # 1 hour
+                "max_concurrent_sessions": 3,
+                "require_mfa": security_level is not SecurityLevel.BASIC,
+                "session_encryption": True
+            },
+            "api_security": {
+                "rate_limiting": {
+                    "default": "100/minute",
+                    "authenticated": "500/minute",
+                    "admin": "1000/minute"
+                },
+                "require_https": True,
+                "cors_policy": {
+                    "allowed_origins": ["https://*.example.com"],
+                    "allowed_methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+                    "allow_credentials": True,
+                    "max_age": 86400
+                }
+            },
+            "data_protection": {
+                "encryption_at_rest": True,
+                "encryption_in_transit": True,
+                "key_rotation_days": 365,
+                "backup_encryption": True,
+                "log_encryption": True
+            },
+            "network_security": {
+                "vpc_isolation": True,
+                "private_subnets": True,
+                "nat_gateway": True,
+                "bastion_host": security_level is SecurityLevel.ENTERPRISE,
+                "vpc_flow_logs": True
+            },
+            "monitoring_and_alerting": {
+                "security_events": True,
+                "failed_login_attempts": True,
+                "privilege_escalation": True,
+                "data_access_anomalies": True,
+                "network_intrusion": True
+            }
+        },
+        "compliance": {
+            "standards": ["ISO 27001", "SOC 2", "GDPR"],
+            "audit_logging": True,
+            "data_retention_days": 2557,  # 7 years
+            "privacy_controls": True
+        },
+        "incident_response": {
+            "automated_response": security_level is SecurityLevel.ENTERPRISE,
+            "notification_channels": ["email", "sms", "slack"],
+            "escalation_matrix": {
+                "low": "security-team@company.com",
+                "medium": "security-team@company.com,ops-team@company.com", 
+                "high": "security-team@company.com,ops-team@company.com,management@company.com",
+                "critical": "all-hands@company.com"
+            }
+        }
+    }
+
 class SecurityConfigGenerator:
     """Generate comprehensive security configuration for Bailian Demo"""
     
+    # Static role definitions shared by every instance (read-only); policy documents are serialized once
+    _ECS_ASSUME_POLICY = MappingProxyType(_service_assume_role_policy("ecs.aliyuncs.com"))
+    _FC_ASSUME_POLICY = MappingProxyType(_service_assume_role_policy("fc.aliyuncs.com"))
+    _CR_ASSUME_POLICY = MappingProxyType(_service_assume_role_policy("ack.aliyuncs.com"))
+    _APIGATEWAY_ASSUME_POLICY = MappingProxyType(_service_assume_role_policy("apigateway.aliyuncs.com"))
+    
+    _ECS_ASSUME_POLICY_JSON = _dumps_indented(dict(_ECS_ASSUME_POLICY))
+    _FC_ASSUME_POLICY_JSON = _dumps_indented(dict(_FC_ASSUME_POLICY))
+    _CR_ASSUME_POLICY_JSON = _dumps_indented(dict(_CR_ASSUME_POLICY))
+    _APIGATEWAY_ASSUME_POLICY_JSON = _dumps_indented(dict(_APIGATEWAY_ASSUME_POLICY))
+    
+    _ECS_POLICIES = (
+        "AliyunRDSReadOnlyAccess",
+        "AliyunKvstoreReadOnlyAccess",
+        "AliyunOSSReadOnlyAccess",
+        "AliyunLogReadOnlyAccess",
+        "AliyunCloudMonitorReadOnlyAccess",
+    )
+    _FC_POLICIES = ("AliyunLogFullAccess", "AliyunOSSReadOnlyAccess", "AliyunRDSReadOnlyAccess")
+    _CR_POLICIES = ("AliyunContainerRegistryFullAccess",)
+    _APIGATEWAY_POLICIES = ("AliyunLogFullAccess", "AliyunCloudMonitorFullAccess")
+    
     def __init__(self, environment: str = "production", security_level: SecurityLevel = SecurityLevel.STANDARD):
-        self.environment = environment
+        # Interned: repeated as a value in every tag dict and resource name
+        self.environment = sys.intern(environment)
         self.security_level = security_level
+        # Level checks are evaluated once here rather than on every create_* call
+        self._is_basic = security_level is SecurityLevel.BASIC
+        self._is_enterprise = security_level is SecurityLevel.ENTERPRISE
         self.project_name = "bailian-demo"
         
     def create_ram_roles(self) -> List[RAMRoleConfig]:
@@ -91,25 +389,9 @@ class SecurityConfigGenerator:
         ecs_role = RAMRoleConfig(
             role_name=f"{self.project_name}-ecs-role-{self.environment}",
             description="ECS service role for Bailian Demo backend services",
-            assume_role_policy={
-                "Version": "1",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {
-                            "Service": ["ecs.aliyuncs.com"]
-                        },
-                        "Action": ["sts:AssumeRole"]
-                    }
-                ]
-            },
-            policies=[
-                "AliyunRDSReadOnlyAccess",
-                "AliyunKvstoreReadOnlyAccess", 
-                "AliyunOSSReadOnlyAccess",
-                "AliyunLogReadOnlyAccess",
-                "AliyunCloudMonitorReadOnlyAccess"
-            ],
+            assume_role_policy=self._ECS_ASSUME_POLICY,
+            assume_role_policy_json=self._ECS_ASSUME_POLICY_JSON,
+            policies=self._ECS_POLICIES,
             tags={
                 "Environment": self.environment,
                 "Project": self.project_name,
@@ -121,23 +403,9 @@ class SecurityConfigGenerator:
         fc_role = RAMRoleConfig(
             role_name=f"{self.project_name}-fc-role-{self.environment}",
             description="Function Compute role for AI processing",
-            assume_role_policy={
-                "Version": "1",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {
-                            "Service": ["fc.aliyuncs.com"]
-                        },
-                        "Action": ["sts:AssumeRole"]
-                    }
-                ]
-            },
-            policies=[
-                "AliyunLogFullAccess",
-                "AliyunOSSReadOnlyAccess",
-                "AliyunRDSReadOnlyAccess"
-            ],
+            assume_role_policy=self._FC_ASSUME_POLICY,
+            assume_role_policy_json=self._FC_ASSUME_POLICY_JSON,
+            policies=self._FC_POLICIES,
             tags={
                 "Environment": self.environment,
                 "Project": self.project_name,
@@ -149,21 +417,9 @@ class SecurityConfigGenerator:
         cr_role = RAMRoleConfig(
             role_name=f"{self.project_name}-cr-role-{self.environment}",
             description="Container Registry access role",
-            assume_role_policy={
-                "Version": "1",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {
-                            "Service": ["ack.aliyuncs.com"]
-                        },
-                        "Action": ["sts:AssumeRole"]
-                    }
-                ]
-            },
-            policies=[
-                "AliyunContainerRegistryFullAccess"
-            ],
+            assume_role_policy=self._CR_ASSUME_POLICY,
+            assume_role_policy_json=self._CR_ASSUME_POLICY_JSON,
+            policies=self._CR_POLICIES,
             tags={
                 "Environment": self.environment,
                 "Project": self.project_name,
@@ -175,22 +431,9 @@ class SecurityConfigGenerator:
         apigateway_role = RAMRoleConfig(
             role_name=f"{self.project_name}-apigateway-role-{self.environment}",
             description="API Gateway service role",
-            assume_role_policy={
-                "Version": "1",
-                "Statement": [
-                    {
-                        "Effect": "Allow",
-                        "Principal": {
-                            "Service": ["apigateway.aliyuncs.com"]
-                        },
-                        "Action": ["sts:AssumeRole"]
-                    }
-                ]
-            },
-            policies=[
-                "AliyunLogFullAccess",
-                "AliyunCloudMonitorFullAccess"
-            ],
+            assume_role_policy=self._APIGATEWAY_ASSUME_POLICY,
+            assume_role_policy_json=self._APIGATEWAY_ASSUME_POLICY_JSON,
+            policies=self._APIGATEWAY_POLICIES,
             tags={
                 "Environment": self.environment,
                 "Project": self.project_name,
@@ -267,19 +510,19 @@ class SecurityConfigGenerator:
         """Create WAF configuration"""
         blocked_regions = []
         
-        if self.security_level == SecurityLevel.ENTERPRISE:
+        if self._is_enterprise:
             # Block high-risk regions for enterprise
             blocked_regions = ["CN-XJ", "CN-XZ"]  # Example regions
             
         return WAFConfig(
             instance_name=f"{self.project_name}-waf-{self.environment}",
             domain=domain,
-            protection_mode="Defense" if self.security_level != SecurityLevel.BASIC else "Warn",
+            protection_mode="Warn" if self._is_basic else "Defense",
             enable_log=True,
             enable_cc_protection=True,
             enable_region_block=len(blocked_regions) > 0,
             blocked_regions=blocked_regions,
-            rate_limit=2000 if self.security_level == SecurityLevel.BASIC else 5000
+            rate_limit=2000 if self._is_basic else 5000
         )
     
     def create_ssl_config(self, domain: str) -> SSLCertificateConfig:
@@ -288,7 +531,7 @@ class SecurityConfigGenerator:
             domain=domain,
             validation_method="DNS",
             auto_renew=True,
-            certificate_type="DV" if self.security_level == SecurityLevel.BASIC else "OV"
+            certificate_type="DV" if self._is_basic else "OV"
         )
     
     def generate_terraform_config(self, domain: str = "bailian-demo.example.com") -> str:
@@ -298,296 +541,86 @@ class SecurityConfigGenerator:
         security_groups = self.create_security_groups()
         waf_config = self.create_waf_config(domain)
         ssl_config = self.create_ssl_config(domain)
+        parts: List[str] = []
+        template_values = {"project_name": self.project_name, "environment": self.environment, "domain": domain}
         
-        terraform_config = f"""
-# Alibaba Cloud Security Configuration
-# Generated for {self.project_name} - {self.environment} environment
-
-terraform {{
-  required_providers {{
-    alicloud = {{
-      source  = "aliyun/alicloud"
-      version = "~> 1.190.0"
-    }}
-  }}
-}}
-
-# Variables
-variable "environment" {{
-  description = "Environment name"
-  type        = string
-  default     = "{self.environment}"
-}}
-
-variable "project_name" {{
-  description = "Project name"
-  type        = string
-  default     = "{self.project_name}"
-}}
-
-variable "domain" {{
-  description = "Domain name for SSL and WAF"
-  type        = string
-  default     = "{domain}"
-}}
-
-# Data sources
-data "alicloud_vpcs" "default" {{
-  name_regex = "default"
-}}
-
-# RAM Roles
-"""
+        parts.append(_TF_HEADER.format_map(template_values))
         
         # Generate RAM roles
         for role in ram_roles:
-            role_name_tf = role.role_name.replace("-", "_")
-            terraform_config += f"""
-resource "alicloud_ram_role" "{role_name_tf}" {{
+            parts.append(f"""
+resource "alicloud_ram_role" "{role.tf_id}" {{
   name        = "{role.role_name}"
   description = "{role.description}"
-  document    = jsonencode({json.dumps(role.assume_role_policy, indent=4)})
+  document    = jsonencode({role.assume_role_policy_json})
   
-  tags = {json.dumps(role.tags, indent=4)}
+  tags = {_dumps_indented(role.tags)}
 }}
-"""
+""")
             
             # Attach policies to role
             for i, policy in enumerate(role.policies):
-                terraform_config += f"""
-resource "alicloud_ram_role_policy_attachment" "{role_name_tf}_policy_{i}" {{
-  role_name   = alicloud_ram_role.{role_name_tf}.name
+                parts.append(f"""
+resource "alicloud_ram_role_policy_attachment" "{role.tf_id}_policy_{i}" {{
+  role_name   = alicloud_ram_role.{role.tf_id}.name
   policy_name = "{policy}"
   policy_type = "System"
 }}
-"""
+""")
         
         # Generate Security Groups
-        terraform_config += "\n# Security Groups\n"
+        parts.append("\n# Security Groups\n")
         for sg in security_groups:
-            sg_name_tf = sg.name.replace("-", "_")
-            terraform_config += f"""
-resource "alicloud_security_group" "{sg_name_tf}" {{
+            parts.append(f"""
+resource "alicloud_security_group" "{sg.tf_id}" {{
   name        = "{sg.name}"
   description = "{sg.description}"
   vpc_id      = data.alicloud_vpcs.default.vpcs[0].id
   
-  tags = {json.dumps(sg.tags, indent=4)}
+  tags = {_dumps_indented(sg.tags)}
 }}
-"""
+""")
             
             # Generate security group rules
             for i, rule in enumerate(sg.rules):
-                rule_name = f"{sg_name_tf}_rule_{i}"
-                terraform_config += f"""
+                rule_name = f"{sg.tf_id}_rule_{i}"
+                parts.append(f"""
 resource "alicloud_security_group_rule" "{rule_name}" {{
   type              = "{rule.direction}"
   ip_protocol       = "{rule.protocol}"
   port_range        = "{rule.port_range}"
-  security_group_id = alicloud_security_group.{sg_name_tf}.id
+  security_group_id = alicloud_security_group.{sg.tf_id}.id
   cidr_ip          = "{rule.source_cidr}"
   description      = "{rule.description}"
   priority         = {rule.priority}
 }}
-"""
+""")
         
         # Generate WAF configuration
-        terraform_config += f"""
-# Web Application Firewall
-resource "alicloud_waf_instance" "main" {{
-  big_screen      = "0"
-  exclusive_ip    = "0"
-  ext_bandwidth   = "50"
-  ext_domain_package = "1"
-  package_code    = "version_3"
-  prefessional_service = "false"
-  subscription_type = "Subscription"
-  waf_log         = "true"
-  log_storage     = "3"
-  log_time        = "180"
-  
-  tags = {{
-    Environment = var.environment
-    Project     = var.project_name
-  }}
-}}
-
-resource "alicloud_waf_domain" "main" {{
-  domain_name   = var.domain
-  instance_id   = alicloud_waf_instance.main.id
-  is_access_product = "On"
-  source_ips    = ["1.1.1.1"]  # Replace with ALB IP
-  cluster_type  = "PhysicalCluster"
-  http2_port    = ["443"]
-  http_port     = ["80"]
-  https_port    = ["443"]
-  http_to_user_ip = "Off"
-  https_redirect  = "On"
-  load_balancing  = "IpHash"
-}}
-
-# WAF Protection Rules
-resource "alicloud_waf_protection_module" "cc_protection" {{
-  domain     = alicloud_waf_domain.main.domain_name
-  instance_id = alicloud_waf_instance.main.id
-  defense_type = "cc"
-  status     = 1
-}}
-
-resource "alicloud_waf_protection_module" "web_attack" {{
-  domain     = alicloud_waf_domain.main.domain_name
-  instance_id = alicloud_waf_instance.main.id
-  defense_type = "waf"
-  status     = 1
-}}
-"""
+        parts.append(_WAF_BLOCK)
         
         # Generate SSL Certificate
-        terraform_config += f"""
-# SSL Certificate
-resource "alicloud_ssl_certificates_service_certificate" "main" {{
-  certificate_name = "{self.project_name}-ssl-{self.environment}"
-  cert             = file("path/to/certificate.crt")
-  key              = file("path/to/private.key")
-}}
-"""
+        parts.append(_SSL_CERTIFICATE_TMPL.format_map(template_values))
         
         # Generate Security Center configuration
-        terraform_config += f"""
-# Security Center (Cloud Security Center)
-resource "alicloud_threat_detection_baseline_strategy" "main" {{
-  baseline_strategy_name = "{self.project_name}-baseline-{self.environment}"
-  custom_type           = "custom"
-  end_time             = "08:00:00"
-  start_time           = "02:00:00"
-  target_type          = "groupId"
-  cycle_days           = 3
-  cycle_start_time     = 3
-}}
-
-resource "alicloud_threat_detection_anti_brute_force_rule" "main" {{
-  name            = "{self.project_name}-anti-brute-force"
-  forbidden_time  = 360
-  fail_count      = 5
-  span            = 60
-  default_rule    = false
-  
-  uuid_list = ["all"]  # Apply to all assets
-}}
-"""
+        parts.append(_SECURITY_CENTER_TMPL.format_map(template_values))
         
         # Outputs
-        terraform_config += """
-# Outputs
-output "ram_roles" {
-  description = "Created RAM roles"
-  value = {
-"""
-        
-        for role in ram_roles:
-            role_name_tf = role.role_name.replace("-", "_")
-            terraform_config += f'    "{role.role_name}" = alicloud_ram_role.{role_name_tf}.arn\n'
-        
-        terraform_config += """  }
-}
-
-output "security_groups" {
-  description = "Created security groups"
-  value = {
-"""
-        
-        for sg in security_groups:
-            sg_name_tf = sg.name.replace("-", "_")
-            terraform_config += f'    "{sg.name}" = alicloud_security_group.{sg_name_tf}.id\n'
+        parts.append(_RAM_ROLES_OUTPUT_HEAD)
+        parts.append("".join(f'    "{role.role_name}" = alicloud_ram_role.{role.tf_id}.arn\n' for role in ram_roles))
+        parts.append(_SECURITY_GROUPS_OUTPUT_HEAD)
+        parts.append("".join(f'    "{sg.name}" = alicloud_security_group.{sg.tf_id}.id\n' for sg in security_groups))
+        parts.append(_TF_FOOTER)
         
-        terraform_config += """  }
-}
-
-output "waf_instance_id" {
-  description = "WAF instance ID"
-  value       = alicloud_waf_instance.main.id
-}
-
-output "ssl_certificate_id" {
-  description = "SSL certificate ID"
-  value       = alicloud_ssl_certificates_service_certificate.main.id
-}
-"""
-        
-        return terraform_config
+        return "".join(parts)
     
-    def generate_security_policies(self) -> Dict[str, Any]:
-        """Generate security policies document"""
-        return {
-            "security_policies": {
-                "password_policy": {
-                    "minimum_length": 12,
-                    "require_uppercase": True,
-                    "require_lowercase": True,
-                    "require_numbers": True,
-                    "require_symbols": True,
-                    "password_expiry_days": 90,
-                    "password_history": 12
-                },
-                "session_policy": {
-                    "session_timeout": 3600,  # 1 hour
-                    "max_concurrent_sessions": 3,
-                    "require_mfa": self.security_level != SecurityLevel.BASIC,
-                    "session_encryption": True
-                },
-                "api_security": {
-                    "rate_limiting": {
-                        "default": "100/minute",
-                        "authenticated": "500/minute",
-                        "admin": "1000/minute"
-                    },
-                    "require_https": True,
-                    "cors_policy": {
-                        "allowed_origins": ["https://*.example.com"],
-                        "allowed_methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-                        "allow_credentials": True,
-                        "max_age": 86400
-                    }
-                },
-                "data_protection": {
-                    "encryption_at_rest": True,
-                    "encryption_in_transit": True,
-                    "key_rotation_days": 365,
-                    "backup_encryption": True,
-                    "log_encryption": True
-                },
-                "network_security": {
-                    "vpc_isolation": True,
-                    "private_subnets": True,
-                    "nat_gateway": True,
-                    "bastion_host": self.security_level == SecurityLevel.ENTERPRISE,
-                    "vpc_flow_logs": True
-                },
-                "monitoring_and_alerting": {
-                    "security_events": True,
-                    "failed_login_attempts": True,
-                    "privilege_escalation": True,
-                    "data_access_anomalies": True,
-                    "network_intrusion": True
-                }
-            },
-            "compliance": {
-                "standards": ["ISO 27001", "SOC 2", "GDPR"],
-                "audit_logging": True,
-                "data_retention_days": 2557,  # 7 years
-                "privacy_controls": True
-            },
-            "incident_response": {
-                "automated_response": self.security_level == SecurityLevel.ENTERPRISE,
-                "notification_channels": ["email", "sms", "slack"],
-                "escalation_matrix": {
-                    "low": "security-team@company.com",
-                    "medium": "security-team@company.com,ops-team@company.com", 
-                    "high": "security-team@company.com,ops-team@company.com,management@company.com",
-                    "critical": "all-hands@company.com"
-                }
-            }
-        }
+    def generate_security_policies(self) -> Mapping[str, Any]:
+        """Generate security policies document
+        
+        The document is cached per security level and shared between callers, so it must not be
+        modified; deep-copy it first if a mutable version is needed.
+        """
+        return _security_policies(self.security_level)
     
     def generate_deployment_script(self) -> str:
         """Generate security deployment script"""
@@ -673,39 +706,53 @@ echo "  4. Enable Security Center monitoring"
 echo "  5. Test security policies"
 """
 
+def _write_terraform(generator: SecurityConfigGenerator, domain: str) -> None:
+    """Write the security Terraform configuration"""
+    with open("security_terraform.tf", "w") as f:
+        f.write(generator.generate_terraform_config(domain))
+
+def _write_policies(generator: SecurityConfigGenerator) -> None:
+    """Write the security policies document"""
+    security_policies = generator.generate_security_policies()
+    if orjson is not None:
+        with open("security_policies.json", "wb") as f:
+            f.write(orjson.dumps(security_policies, option=orjson.OPT_INDENT_2))
+    else:
+        with open("security_policies.json", "w") as f:
+            json.dump(security_policies, f, indent=2)
+
+def _write_deployment_script(generator: SecurityConfigGenerator) -> None:
+    """Write the deployment script and make it executable"""
+    with open("deploy_security.sh", "w") as f:
+        f.write(generator.generate_deployment_script())
+    os.chmod("deploy_security.sh", 0o755)
+
 def main():
     """Main function to generate security configuration"""
     import argparse
     
     parser = argparse.ArgumentParser(description="Generate Alibaba Cloud security configuration")
     parser.add_argument("--environment", default="production", help="Environment name")
-    parser.add_argument("--security-level", choices=["basic", "standard", "enterprise"], 
-                       default="standard", help="Security level")
+    # argparse converts straight to the enum; metavar keeps the plain values in --help
+    parser.add_argument("--security-level", type=SecurityLevel, choices=list(SecurityLevel),
+                       default=SecurityLevel.STANDARD, help="Security level",
+                       metavar="{" + ",".join(level.value for level in SecurityLevel) + "}")
     parser.add_argument("--domain", default="bailian-demo.example.com", help="Domain name")
     
     args = parser.parse_args()
     
-    security_level = SecurityLevel(args.security_level)
+    security_level = args.security_level
     generator = SecurityConfigGenerator(args.environment, security_level)
     
-    # Generate configurations
-    terraform_config = generator.generate_terraform_config(args.domain)
-    security_policies = generator.generate_security_policies()
-    deployment_script = generator.generate_deployment_script()
-    
-    # Save configurations
-    with open("security_terraform.tf", "w") as f:
-        f.write(terraform_config)
-    
-    with open("security_policies.json", "w") as f:
-        json.dump(security_policies, f, indent=2)
-    
-    with open("deploy_security.sh", "w") as f:
-        f.write(deployment_script)
-    
-    # Make deployment script executable
-    import os
-    os.chmod("deploy_security.sh", 0o755)
+    # Generate and save configurations; the three files are independent
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(_write_terraform, generator, args.domain),
+            executor.submit(_write_policies, generator),
+            executor.submit(_write_deployment_script, generator)
+        ]
+        for future in futures:
+            future.result()
     
     print("✅ Security configuration files generated:")
     print("  - security_terraform.tf (Terraform configuration)")
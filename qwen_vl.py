@@ -1,26 +1,73 @@
+import hashlib
 import os
+import time
+from functools import lru_cache
+from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
-# 加载.env文件
-load_dotenv()
-
-client = OpenAI(
-    # 从.env文件中读取API key
-    api_key=os.getenv("qwen_api_key"),
-    base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-)
-completion = client.chat.completions.create(
-    model="qwen-vl-max-latest",
-    messages=[
-        {"role": "system",
-         "content": [{"type": "text","text": "You are a helpful assistant."}]},
-        {"role": "user","content": [{
-            # 直接传入视频文件时，请将type的值设置为video_url
-            # 使用OpenAI SDK时，视频文件默认每间隔0.5秒抽取一帧，且不支持修改，如需自定义抽帧频率，请使用DashScope SDK.
-            "type": "video_url",            
-            "video_url": {"url": "https://help-static-aliyun-doc.aliyuncs.com/file-manage-files/zh-CN/20241115/cqqkru/1.mp4"}},
-            {"type": "text","text": "这段视频的内容是什么?请你详细描述"}]
-         }]
-)
-print(completion.choices[0].message.content)
\ No newline at end of file
+MODEL = "qwen-vl-max-latest"
+VIDEO_URL = "https://help-static-aliyun-doc.aliyuncs.com/file-manage-files/zh-CN/20241115/cqqkru/1.mp4"
+PROMPT = "这段视频的内容是什么?请你详细描述"
+
+# 相同模型、视频和提示词的描述结果缓存在本地，避免重复计费
+CACHE_DIR = Path(".qwen_cache")
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+@lru_cache(maxsize=1)
+def get_client() -> OpenAI:
+    # 只创建一次客户端并复用其连接池，避免重复加载.env和重新建立连接
+    # 加载.env文件
+    load_dotenv()
+    return OpenAI(
+        # 从.env文件中读取API key
+        api_key=os.getenv("qwen_api_key"),
+        base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
+    )
+
+
+def cache_path(model: str, url: str, prompt: str) -> Path:
+    key = hashlib.blake2b(f"{model}|{url}|{prompt}".encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{key}.txt"
+
+
+def load_cached(path: Path):
+    # 缓存不存在或已过期时返回None
+    try:
+        if time.time() - path.stat().st_mtime < CACHE_TTL_SECONDS:
+            return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        pass
+    return None
+
+
+if __name__ == "__main__":
+    cached_file = cache_path(MODEL, VIDEO_URL, PROMPT)
+    cached = load_cached(cached_file)
+    if cached is not None:
+        print(cached)
+    else:
+        completion = get_client().chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system",
+                 "content": [{"type": "text","text": "You are a helpful assistant."}]},
+                {"role": "user","content": [{
+                    # 直接传入视频文件时，请将type的值设置为video_url
+                    # 使用OpenAI SDK时，视频文件默认每间隔0.5秒抽取一帧，且不支持修改，如需自定义抽帧频率，请使用DashScope SDK.
+                    "type": "video_url",
+                    "video_url": {"url": VIDEO_URL}},
+                    {"type": "text","text": PROMPT}]
+                 }],
+            # 流式返回，边生成边输出，缩短首字延迟
+            stream=True
+        )
+        pieces = []
+        for chunk in completion:
+            if chunk.choices and chunk.choices[0].delta.content:
+                pieces.append(chunk.choices[0].delta.content)
+                print(chunk.choices[0].delta.content, end="", flush=True)
+        print()
+        CACHE_DIR.mkdir(exist_ok=True)
+        cached_file.write_text("".join(pieces), encoding="utf-8")
@@ -13,6 +13,46 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:  # optional: libuv-based event loop
+    pass
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding/decoding
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+try:
+    import simdjson
+except ImportError:  # optional: SIMD JSON parsing for large AI model responses
+    simdjson = None
+
+# Bodies above this size (or of unknown size) are parsed with simdjson when it is installed
+LARGE_RESPONSE_BYTES = 16 * 1024
+
+def _write_json_report(report_file: str, report: Dict[str, Any]):
+    """Write a report as two-space indented JSON, using orjson when installed"""
+    if orjson is not None:
+        with open(report_file, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+# Monotonic integer clock for step timing: immune to wall-clock adjustments, converted to seconds only at the end
+_mono = time.monotonic_ns
+
 @dataclass
 class TestStep:
     """Individual test step"""
@@ -41,12 +81,14 @@ class IntegrationTester:
         self.test_results = {}
         self.access_token = None
         self.test_data = {}
+        # Default request headers, built once; the bearer token is added after authentication
+        self._headers = {"Content-Type": "application/json"}
     
     async def setup(self):
         """Setup test environment"""
         connector = aiohttp.TCPConnector(limit=10)
         timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, json_serialize=_json_dumps)
         
         # Authenticate
         await self.authenticate()
@@ -66,8 +108,9 @@ class IntegrationTester:
         try:
             async with self.session.post(f"{self.base_url}/api/auth/login", json=auth_data) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = await response.json(loads=_json_loads)
                     self.access_token = result["data"]["access_token"]
+                    self._headers["Authorization"] = f"Bearer {self.access_token}"
                     print("✅ Authentication successful")
                     return True
                 else:
@@ -78,31 +121,26 @@ class IntegrationTester:
     
     async def execute_step(self, step: TestStep) -> Dict[str, Any]:
         """Execute individual test step"""
-        headers = {"Content-Type": "application/json"}
-        if self.access_token:
-            headers["Authorization"] = f"Bearer {self.access_token}"
+        headers = self._headers
         if step.headers:
-            headers.update(step.headers)
+            headers = {**headers, **step.headers}
         
-        start_time = time.time()
+        start_time = _mono()
         
         try:
             url = f"{self.base_url}{step.endpoint}"
             
-            if step.method.upper() == "GET":
-                async with self.session.get(url, headers=headers) as response:
-                    response_data = await response.json() if response.content_type == 'application/json' else await response.text()
-            elif step.method.upper() == "POST":
-                async with self.session.post(url, json=step.data, headers=headers) as response:
-                    response_data = await response.json() if response.content_type == 'application/json' else await response.text()
-            elif step.method.upper() == "PUT":
-                async with self.session.put(url, json=step.data, headers=headers) as response:
-                    response_data = await response.json() if response.content_type == 'application/json' else await response.text()
-            elif step.method.upper() == "DELETE":
-                async with self.session.delete(url, headers=headers) as response:
-                    response_data = await response.json() if response.content_type == 'application/json' else await response.text()
+            # GET/DELETE steps carry no data, so json=None sends no body
+            async with self.session.request(step.method.upper(), url, json=step.data, headers=headers) as response:
+                if response.content_type != 'application/json':
+                    response_data = await response.text()
+                elif simdjson is not None and (response.content_length is None
+                                               or response.content_length > LARGE_RESPONSE_BYTES):
+                    response_data = simdjson.loads(await response.read())
+                else:
+                    response_data = await response.json(loads=_json_loads)
             
-            duration = time.time() - start_time
+            duration = (_mono() - start_time) / 1e9
             
             # Validate response
             status_ok = response.status == step.expected_status
@@ -131,7 +169,7 @@ class IntegrationTester:
             }
             
         except Exception as e:
-            duration = time.time() - start_time
+            duration = (_mono() - start_time) / 1e9
             return {
                 "step_name": step.name,
                 "success": False,
@@ -161,25 +199,25 @@ class IntegrationTester:
             }
         }
         
-        suite_start_time = time.time()
+        suite_start_time = _mono()
         
         for step in suite.steps:
-            print(f"  🔸 {step.name}...")
             step_result = await self.execute_step(step)
             suite_results["steps"].append(step_result)
             
+            # Suites may run concurrently, so each line names its step
             if step_result["success"]:
                 suite_results["summary"]["passed_steps"] += 1
-                print(f"    ✅ Passed ({step_result['response_time']:.2f}s)")
+                print(f"  🔸 {step.name}: ✅ Passed ({step_result['response_time']:.2f}s)")
             else:
                 suite_results["summary"]["failed_steps"] += 1
-                print(f"    ❌ Failed: {step_result.get('error', 'Status/validation error')}")
+                print(f"  🔸 {step.name}: ❌ Failed: {step_result.get('error', 'Status/validation error')}")
             
             # Store data for subsequent steps
             if step_result["success"] and step_result["response_data"]:
                 self.test_data[step.name] = step_result["response_data"]
         
-        suite_duration = time.time() - suite_start_time
+        suite_duration = (_mono() - suite_start_time) / 1e9
         suite_results["summary"]["total_duration"] = suite_duration
         suite_results["summary"]["success_rate"] = (
             suite_results["summary"]["passed_steps"] / suite_results["summary"]["total_steps"] * 100
@@ -245,7 +283,8 @@ def create_integration_test_suites() -> List[TestSuite]:
                 "prompt": "A simple test image",
                 "parameters": {"size": "512*512", "quality": "medium"}
             }),
-        ]
+        ],
+        dependencies=["Authentication Tests"]
     )
     
     # Database Integration Tests  
@@ -305,10 +344,21 @@ async def main():
         overall_passed = 0
         overall_total = 0
         
+        # Suites without dependencies share no data and run concurrently; the rest follow one at a time
+        independent = [suite for suite in test_suites if not suite.dependencies]
+        dependent = [suite for suite in test_suites if suite.dependencies]
+        
+        results_by_name = {}
+        for result in await asyncio.gather(*(tester.run_test_suite(suite) for suite in independent)):
+            results_by_name[result["suite_name"]] = result
+        for suite in dependent:
+            results_by_name[suite.name] = await tester.run_test_suite(suite)
+        print()
+        
         for i, suite in enumerate(test_suites, 1):
-            print(f"📋 Test Suite {i}/{total_suites}")
-            result = await tester.run_test_suite(suite)
+            result = results_by_name[suite.name]
             all_results.append(result)
+            print(f"📋 Test Suite {i}/{total_suites}: {suite.name}")
             
             overall_passed += result["summary"]["passed_steps"]
             overall_total += result["summary"]["total_steps"]
@@ -352,8 +402,7 @@ async def main():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_file = f"integration_test_report_{timestamp}.json"
         
-        with open(report_file, 'w') as f:
-            json.dump(final_report, f, indent=2)
+        _write_json_report(report_file, final_report)
         
         # Print summary
         print("=" * 60)
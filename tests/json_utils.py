@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+JSON file helpers shared by the test scripts
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding
+    orjson = None
+
+def write_json_atomic(path, obj):
+    """Write obj as two-space indented JSON so that either the complete file or nothing is left behind"""
+    path = Path(path)
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode("utf-8")
+    
+    # A unique temporary file in the target directory keeps concurrent writers apart and lets os.replace stay atomic
+    tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    replaced = False
+    try:
+        with tmp:
+            tmp.write(data)
+        # NamedTemporaryFile creates files as 0600; results are meant to be as readable as other outputs
+        os.chmod(tmp.name, 0o644)
+        os.replace(tmp.name, path)
+        replaced = True
+    finally:
+        if not replaced:
+            os.unlink(tmp.name)
@@ -6,15 +6,56 @@ Load testing, stress testing, and performance optimization
 
 import asyncio
 import aiohttp
+import bisect
+import gc
+import math
 import time
 import json
 import statistics
-from typing import Dict, List, Any
-from dataclasses import dataclass
+from collections import Counter
+from typing import Dict, List, Any, NamedTuple, Optional
+from dataclasses import dataclass, field
 from datetime import datetime
-import concurrent.futures
 import os
-import subprocess
+
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:  # optional: libuv-based event loop
+    pass
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding/decoding
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# Monotonic integer clock for request timing: immune to wall-clock adjustments, converted to seconds only at the end
+_mono = time.monotonic_ns
+
+def _write_json_report(report_file: str, report: Dict[str, Any]):
+    """Write a report as two-space indented JSON, using orjson when installed"""
+    if orjson is not None:
+        with open(report_file, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+def create_session(max_users: int) -> aiohttp.ClientSession:
+    """HTTP session for load testing with a keep-alive connection pool sized for max_users simulated users"""
+    # Each simulated user has at most one request in flight, so one keep-alive connection per user suffices
+    connector = aiohttp.TCPConnector(limit=max_users, keepalive_timeout=60, enable_cleanup_closed=True)
+    timeout = aiohttp.ClientTimeout(total=30)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, json_serialize=_json_dumps)
 
 @dataclass
 class TestConfig:
@@ -24,6 +65,7 @@ class TestConfig:
     test_duration: int  # seconds
     ramp_up_time: int   # seconds
     endpoints: List[str]
+    target_rps_per_user: Optional[float] = None  # None: closed loop, each user sends its next request immediately
 
 @dataclass
 class TestResult:
@@ -38,14 +80,147 @@ class TestResult:
     p95_response_time: float
     requests_per_second: float
     error_rate: float
+    stdev_response_time: float = 0.0
+    status_code_distribution: Dict[int, int] = field(default_factory=dict)  # 0 counts connection errors
+
+class RequestResult(NamedTuple):
+    """Outcome of a single load-test request (a tuple, so no per-request dict)"""
+    endpoint: str
+    status_code: int
+    response_time: float
+    success: bool
+    error: Optional[str] = None
+
+class OnlineStats:
+    """Running request statistics in constant memory
+    
+    Tracks count, successes, a status code histogram, min/max, the Welford mean/variance of response times and
+    a P² (Jain & Chlamtac) estimate of one quantile, so samples need not be retained.
+    The first EXACT_LIMIT samples are also kept so short runs report an exact quantile.
+    """
+    
+    EXACT_LIMIT = 1000
+    
+    def __init__(self, quantile: float = 0.95):
+        self.count = 0
+        self.successful = 0
+        self.status_codes: Counter = Counter()
+        self.min = math.inf
+        self.max = -math.inf
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._samples: Optional[List[float]] = []
+        
+        # P² markers: heights, actual positions, desired positions and their increments
+        self._quantile = quantile
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self._increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+    
+    def update(self, response_time: float, success: bool, status_code: int):
+        """Add one request observation"""
+        self.count += 1
+        if success:
+            self.successful += 1
+        self.status_codes[status_code] += 1
+        if response_time < self.min:
+            self.min = response_time
+        if response_time > self.max:
+            self.max = response_time
+        
+        delta = response_time - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (response_time - self.mean)
+        
+        if self._samples is not None:
+            if self.count <= self.EXACT_LIMIT:
+                self._samples.append(response_time)
+            else:
+                self._samples = None
+        self._update_quantile(response_time)
+    
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation of response times"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+    
+    @property
+    def quantile(self) -> float:
+        """Response time at the tracked quantile; exact up to EXACT_LIMIT samples, estimated beyond"""
+        if not self.count:
+            return 0.0
+        if self._samples is not None:
+            samples = sorted(self._samples)
+            return samples[min(int(self._quantile * len(samples)), len(samples) - 1)]
+        return self._heights[2]
+    
+    def _update_quantile(self, x: float):
+        heights, positions = self._heights, self._positions
+        
+        # The first five observations seed the markers
+        if len(heights) < 5:
+            bisect.insort(heights, x)
+            return
+        
+        # Find the cell containing x, extending the extreme markers if needed
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(heights, x) - 1
+        
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        
+        # Move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self._desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+    
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
 
 class PerformanceTester:
     """Comprehensive performance testing framework"""
     
-    def __init__(self, config: TestConfig):
+    def __init__(self, config: TestConfig, access_token: Optional[str] = None,
+                 session: Optional[aiohttp.ClientSession] = None):
         self.config = config
         self.results = []
-        self.access_token = None
+        self.access_token = access_token
+        # Per-request headers and URLs, built once instead of on every request
+        self._headers: Dict[str, str] = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+        self._urls = {endpoint: f"{config.base_url}{endpoint}" for endpoint in config.endpoints}
+        # A session passed in is shared with other testers and left open; otherwise one is opened per tester
+        self._session = session
+        self._owns_session = session is None
+    
+    async def __aenter__(self):
+        """Open the HTTP session shared by authentication and every endpoint load test, unless one was passed in"""
+        if self._owns_session:
+            self._session = create_session(self.config.concurrent_users)
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._owns_session:
+            await self._session.close()
+            self._session = None
     
     async def authenticate(self) -> bool:
         """Authenticate and get access token"""
@@ -54,103 +229,103 @@ class PerformanceTester:
             "password": os.getenv("TEST_PASSWORD", "AdminPass123!")
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(f"{self.config.base_url}/api/auth/login", json=auth_data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        self.access_token = result["data"]["access_token"]
-                        return True
-            except Exception as e:
-                print(f"❌ Authentication failed: {e}")
+        try:
+            async with self._session.post(f"{self.config.base_url}/api/auth/login", json=auth_data) as response:
+                if response.status == 200:
+                    result = await response.json(loads=_json_loads)
+                    self.access_token = result["data"]["access_token"]
+                    self._headers = {"Authorization": f"Bearer {self.access_token}"}
+                    return True
+        except Exception as e:
+            print(f"❌ Authentication failed: {e}")
         return False
     
-    async def make_request(self, session: aiohttp.ClientSession, endpoint: str) -> Dict[str, Any]:
+    async def make_request(self, session: aiohttp.ClientSession, endpoint: str) -> RequestResult:
         """Make HTTP request and measure performance"""
-        headers = {"Authorization": f"Bearer {self.access_token}"} if self.access_token else {}
-        start_time = time.time()
+        url, headers = self._urls[endpoint], self._headers
+        start_time = _mono()
         
         try:
-            async with session.get(f"{self.config.base_url}{endpoint}", headers=headers) as response:
-                await response.text()  # Ensure response is fully read
-                duration = time.time() - start_time
+            async with session.get(url, headers=headers) as response:
+                # Read the body so the timing covers the full response and the connection goes back to the pool;
+                # bytes are enough since the content is never inspected
+                await response.read()
+                duration = (_mono() - start_time) / 1e9
                 
-                return {
-                    "endpoint": endpoint,
-                    "status_code": response.status,
-                    "response_time": duration,
-                    "success": 200 <= response.status < 400
-                }
+                return RequestResult(endpoint, response.status, duration, 200 <= response.status < 400)
         except Exception as e:
-            duration = time.time() - start_time
-            return {
-                "endpoint": endpoint,
-                "status_code": 0,
-                "response_time": duration,
-                "success": False,
-                "error": str(e)
-            }
+            duration = (_mono() - start_time) / 1e9
+            return RequestResult(endpoint, 0, duration, False, str(e))
     
     async def load_test_endpoint(self, endpoint: str) -> TestResult:
         """Perform load test on specific endpoint"""
         print(f"🔄 Load testing {endpoint}...")
         
-        requests_data = []
-        connector = aiohttp.TCPConnector(limit=self.config.concurrent_users * 2)
-        timeout = aiohttp.ClientTimeout(total=30)
+        stats = OnlineStats()
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            start_time = time.time()
-            
-            # Ramp up users gradually
-            tasks = []
-            for i in range(self.config.concurrent_users):
-                await asyncio.sleep(self.config.ramp_up_time / self.config.concurrent_users)
-                task = self.user_simulation(session, endpoint, start_time)
-                tasks.append(task)
+        # Garbage collection is paused for the measurement window so its pauses do not show up as request latency
+        gc.collect()
+        gc.disable()
+        try:
+            start_time = _mono()
             
-            # Execute all user simulations
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Ramp up users gradually: all users are scheduled now, each waiting for its own start offset.
+            # Connections kept alive by the previous endpoint's users are reused
+            ramp_step = self.config.ramp_up_time / self.config.concurrent_users
+            tasks = [
+                self.user_simulation(self._session, endpoint, start_time, stats, start_offset=i * ramp_step)
+                for i in range(self.config.concurrent_users)
+            ]
             
-            # Collect all request data
-            for result in results:
-                if isinstance(result, list):
-                    requests_data.extend(result)
+            # Execute all user simulations; they all feed the shared stats
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            gc.enable()
         
-        return self.analyze_results(endpoint, requests_data)
+        return self.analyze_results(endpoint, stats)
     
-    async def user_simulation(self, session: aiohttp.ClientSession, endpoint: str, start_time: float) -> List[Dict]:
-        """Simulate individual user load"""
-        user_requests = []
+    async def user_simulation(self, session: aiohttp.ClientSession, endpoint: str, start_time: int,
+                              stats: OnlineStats, start_offset: float = 0.0):
+        """Simulate individual user load, starting start_offset seconds into the ramp-up"""
+        target_rps = self.config.target_rps_per_user
         
-        while time.time() - start_time < self.config.test_duration:
-            request_result = await self.make_request(session, endpoint)
-            user_requests.append(request_result)
+        async def _loop():
+            # Bind hot-loop callables to locals once rather than looking them up on every request
+            make_request, update, mono, sleep = self.make_request, stats.update, _mono, asyncio.sleep
+            
+            await sleep(start_offset)
+            if not target_rps:
+                while True:
+                    _, status_code, response_time, success, _ = await make_request(session, endpoint)
+                    update(response_time, success, status_code)
             
-            # Add small delay between requests (realistic user behavior)
-            await asyncio.sleep(0.1)
+            # Pace against a fixed schedule so slow responses do not push later requests back
+            interval_ns = int(1e9 / target_rps)
+            next_send = mono()
+            while True:
+                _, status_code, response_time, success, _ = await make_request(session, endpoint)
+                update(response_time, success, status_code)
+                
+                next_send += interval_ns
+                await sleep(max(0, next_send - mono()) / 1e9)
         
-        return user_requests
+        # A single event-loop deadline ends the user at the end of the test window instead of a clock check per request;
+        # a request still in flight at the deadline is cancelled and not counted
+        remaining = self.config.test_duration - (_mono() - start_time) / 1e9
+        try:
+            await asyncio.wait_for(_loop(), timeout=remaining)
+        except asyncio.TimeoutError:
+            pass
     
-    def analyze_results(self, endpoint: str, requests_data: List[Dict]) -> TestResult:
+    def analyze_results(self, endpoint: str, stats: OnlineStats) -> TestResult:
         """Analyze performance test results"""
-        if not requests_data:
+        if not stats.count:
             return TestResult(endpoint, 0, 0, 0, 0, 0, 0, 0, 0, 100)
         
-        total_requests = len(requests_data)
-        successful_requests = sum(1 for r in requests_data if r["success"])
+        total_requests = stats.count
+        successful_requests = stats.successful
         failed_requests = total_requests - successful_requests
         
-        response_times = [r["response_time"] for r in requests_data]
-        avg_response_time = statistics.mean(response_times)
-        min_response_time = min(response_times)
-        max_response_time = max(response_times)
-        
-        # Calculate 95th percentile
-        sorted_times = sorted(response_times)
-        p95_index = int(0.95 * len(sorted_times))
-        p95_response_time = sorted_times[p95_index] if p95_index < len(sorted_times) else max_response_time
-        
         requests_per_second = total_requests / self.config.test_duration
         error_rate = (failed_requests / total_requests) * 100 if total_requests > 0 else 0
         
@@ -159,12 +334,14 @@ class PerformanceTester:
             total_requests=total_requests,
             successful_requests=successful_requests,
             failed_requests=failed_requests,
-            avg_response_time=avg_response_time,
-            min_response_time=min_response_time,
-            max_response_time=max_response_time,
-            p95_response_time=p95_response_time,
+            avg_response_time=stats.mean,
+            min_response_time=stats.min,
+            max_response_time=stats.max,
+            p95_response_time=stats.quantile,
             requests_per_second=requests_per_second,
-            error_rate=error_rate
+            error_rate=error_rate,
+            stdev_response_time=stats.stdev,
+            status_code_distribution=dict(sorted(stats.status_codes.items()))
         )
     
     async def run_performance_tests(self) -> List[TestResult]:
@@ -172,8 +349,8 @@ class PerformanceTester:
         print("🚀 Starting Performance Tests...")
         print(f"Configuration: {self.config.concurrent_users} users, {self.config.test_duration}s duration")
         
-        # Authenticate first
-        if not await self.authenticate():
+        # Authenticate first, unless a token from an earlier scenario was passed in
+        if not self.access_token and not await self.authenticate():
             print("❌ Authentication failed, running tests without auth")
         
         results = []
@@ -202,6 +379,7 @@ class PerformanceTester:
                 "concurrent_users": self.config.concurrent_users,
                 "test_duration": self.config.test_duration,
                 "ramp_up_time": self.config.ramp_up_time,
+                "target_rps_per_user": self.config.target_rps_per_user,
                 "endpoints_tested": len(self.config.endpoints)
             },
             "overall_metrics": {
@@ -218,8 +396,10 @@ class PerformanceTester:
                     "requests_per_second": r.requests_per_second,
                     "avg_response_time_ms": r.avg_response_time * 1000,
                     "p95_response_time_ms": r.p95_response_time * 1000,
+                    "stdev_response_time_ms": r.stdev_response_time * 1000,
                     "error_rate": r.error_rate,
-                    "total_requests": r.total_requests
+                    "total_requests": r.total_requests,
+                    "status_code_distribution": r.status_code_distribution
                 }
                 for r in results
             ],
@@ -302,34 +482,38 @@ async def main():
     
     test_scenarios = create_test_scenarios()
     all_reports = []
+    # Log in once and hand the token to later scenarios instead of repeating the login for each one
+    access_token = None
     
-    for i, config in enumerate(test_scenarios, 1):
-        print(f"\n📊 Running Test Scenario {i}/{len(test_scenarios)}")
-        print(f"Users: {config.concurrent_users}, Duration: {config.test_duration}s")
-        
-        tester = PerformanceTester(config)
-        results = await tester.run_performance_tests()
-        report = tester.generate_report(results)
-        all_reports.append(report)
-        
-        print(f"Grade: {report['performance_grade']}")
-        print(f"Average RPS: {report['overall_metrics']['average_rps']:.1f}")
-        print(f"Error Rate: {report['overall_metrics']['overall_error_rate']:.1f}%")
+    # One session for the whole run, so pooled connections and cached DNS lookups carry over between scenarios
+    async with create_session(max(config.concurrent_users for config in test_scenarios)) as session:
+        for i, config in enumerate(test_scenarios, 1):
+            print(f"\n📊 Running Test Scenario {i}/{len(test_scenarios)}")
+            print(f"Users: {config.concurrent_users}, Duration: {config.test_duration}s")
+            
+            async with PerformanceTester(config, access_token=access_token, session=session) as tester:
+                results = await tester.run_performance_tests()
+                report = tester.generate_report(results)
+                access_token = tester.access_token
+            all_reports.append(report)
+            
+            print(f"Grade: {report['performance_grade']}")
+            print(f"Average RPS: {report['overall_metrics']['average_rps']:.1f}")
+            print(f"Error Rate: {report['overall_metrics']['overall_error_rate']:.1f}%")
     
     # Save comprehensive report
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     report_file = f"performance_test_report_{timestamp}.json"
     
-    with open(report_file, 'w') as f:
-        json.dump({
-            "test_timestamp": datetime.now().isoformat(),
-            "scenarios": all_reports,
-            "summary": {
-                "total_scenarios": len(test_scenarios),
-                "overall_grade": max([r["performance_grade"] for r in all_reports], key=lambda x: x.split()[0]),
-                "recommendations": list(set(sum([r["recommendations"] for r in all_reports], [])))
-            }
-        }, f, indent=2)
+    _write_json_report(report_file, {
+        "test_timestamp": datetime.now().isoformat(),
+        "scenarios": all_reports,
+        "summary": {
+            "total_scenarios": len(test_scenarios),
+            "overall_grade": max([r["performance_grade"] for r in all_reports], key=lambda x: x.split()[0]),
+            "recommendations": list(set(sum([r["recommendations"] for r in all_reports], [])))
+        }
+    })
     
     print(f"\n📄 Performance report saved: {report_file}")
     print("🎉 Performance testing completed!")
@@ -13,42 +13,44 @@ def test_backend_api():
     
     print("Testing backend API...")
     
-    # Test health endpoint
-    try:
-        response = requests.get(f"{base_url}/health")
-        if response.status_code == 200 and response.json().get("status") == "healthy":
-            print("✓ Health check passed")
-        else:
-            print("✗ Health check failed")
+    # One session for all probes so they share a single keep-alive connection
+    with requests.Session() as session:
+        # Test health endpoint
+        try:
+            response = session.get(f"{base_url}/health")
+            if response.status_code == 200 and response.json().get("status") == "healthy":
+                print("✓ Health check passed")
+            else:
+                print("✗ Health check failed")
+                return False
+        except Exception as e:
+            print(f"✗ Health check failed: {e}")
             return False
-    except Exception as e:
-        print(f"✗ Health check failed: {e}")
-        return False
-    
-    # Test root endpoint
-    try:
-        response = requests.get(f"{base_url}/")
-        if response.status_code == 200:
-            print("✓ Root endpoint passed")
-        else:
-            print("✗ Root endpoint failed")
+        
+        # Test root endpoint
+        try:
+            response = session.get(f"{base_url}/")
+            if response.status_code == 200:
+                print("✓ Root endpoint passed")
+            else:
+                print("✗ Root endpoint failed")
+                return False
+        except Exception as e:
+            print(f"✗ Root endpoint failed: {e}")
             return False
-    except Exception as e:
-        print(f"✗ Root endpoint failed: {e}")
-        return False
-    
-    # Test auth endpoints (should return 401 without auth)
-    try:
-        response = requests.get(f"{base_url}/api/auth/user")
-        if response.status_code == 401:
-            print("✓ Auth endpoint correctly requires authentication")
-        else:
-            print("✗ Auth endpoint should require authentication")
+        
+        # Test auth endpoints (should return 401 without auth)
+        try:
+            response = session.get(f"{base_url}/api/auth/user")
+            if response.status_code == 401:
+                print("✓ Auth endpoint correctly requires authentication")
+            else:
+                print("✗ Auth endpoint should require authentication")
+                return False
+        except Exception as e:
+            print(f"✗ Auth endpoint test failed: {e}")
             return False
-    except Exception as e:
-        print(f"✗ Auth endpoint test failed: {e}")
-        return False
-    
+        
     print("All backend API tests passed!")
     return True
 
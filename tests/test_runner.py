@@ -7,25 +7,41 @@ import subprocess
 import sys
 import os
 import argparse
-import json
+import importlib.util
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from pathlib import Path
 
-def run_backend_tests():
-    """Run backend tests"""
+# Test records are kept relative to the directory the runner is started from
+RECORDS_DIR = Path("test_records")
+
+# Smoke and accessibility checks are imported from this directory and run in-process
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from json_utils import write_json_atomic
+
+def stream_command(cmd, cwd, label):
+    """Run a command, echoing its combined stdout/stderr line by line as it is produced"""
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+                          cwd=cwd) as proc:
+        # Suites run concurrently, so each line is tagged with the suite it came from
+        for line in proc.stdout:
+            print(f"[{label}] {line}", end="")
+    return proc.returncode == 0
+
+def run_backend_tests(workers="auto"):
+    """Run backend tests, spread over `workers` pytest-xdist processes when xdist is installed"""
     print("Running backend tests...")
+    cmd = [sys.executable, "-m", "pytest", "backend/tests", "-v", "--tb=short"]
+    if importlib.util.find_spec("xdist") is not None:
+        # loadfile keeps each test module on one worker so module-level fixtures are not shared across processes
+        cmd += ["-n", workers, "--dist=loadfile"]
+    else:
+        print("pytest-xdist not installed, running backend tests sequentially")
     try:
-        result = subprocess.run([
-            sys.executable, "-m", "pytest", 
-            "backend/tests", 
-            "-v", 
-            "--tb=short"
-        ], capture_output=True, text=True, cwd=os.getcwd())
-        
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-            
-        return result.returncode == 0
+        return stream_command(cmd, os.getcwd(), "backend")
     except Exception as e:
         print(f"Error running backend tests: {e}")
         return False
@@ -34,15 +50,7 @@ def run_frontend_tests():
     """Run frontend tests"""
     print("Running frontend tests...")
     try:
-        result = subprocess.run([
-            "npm", "test"
-        ], capture_output=True, text=True, cwd=os.path.join(os.getcwd(), "frontend"))
-        
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-            
-        return result.returncode == 0
+        return stream_command(["npm", "test"], os.path.join(os.getcwd(), "frontend"), "frontend")
     except Exception as e:
         print(f"Error running frontend tests: {e}")
         return False
@@ -51,15 +59,8 @@ def run_smoke_tests():
     """Run smoke tests"""
     print("Running smoke tests...")
     try:
-        result = subprocess.run([
-            sys.executable, "tests/smoke_test.py"
-        ], capture_output=True, text=True, cwd=os.getcwd())
-        
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-            
-        return result.returncode == 0
+        import smoke_test
+        return smoke_test.main() == 0
     except Exception as e:
         print(f"Error running smoke tests: {e}")
         return False
@@ -68,47 +69,38 @@ def run_frontend_accessibility_test():
     """Run frontend accessibility test"""
     print("Running frontend accessibility test...")
     try:
-        result = subprocess.run([
-            sys.executable, "tests/frontend_test.py"
-        ], capture_output=True, text=True, cwd=os.getcwd())
-        
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-            
-        return result.returncode == 0
+        import frontend_test
+        return frontend_test.main() == 0
     except Exception as e:
         print(f"Error running frontend accessibility test: {e}")
         return False
 
-def run_integration_tests():
+def run_integration_tests(workers="auto"):
     """Run integration tests"""
     print("Running integration tests...")
     # For now, we'll just run backend tests as integration tests
     # In a real scenario, you would have separate integration tests
-    return run_backend_tests()
+    return run_backend_tests(workers)
 
 def record_test_results(results):
     """Record test results to a file"""
-    timestamp = datetime.now().isoformat()
     test_record = {
-        "timestamp": timestamp,
+        "timestamp": datetime.now().isoformat(),
         "results": results
     }
     
     # Create test_records directory if it doesn't exist
-    records_dir = os.path.join(os.getcwd(), "test_records")
-    if not os.path.exists(records_dir):
-        os.makedirs(records_dir)
+    RECORDS_DIR.mkdir(exist_ok=True)
     
-    # Write test record to file
-    record_file = os.path.join(records_dir, f"test_record_{timestamp.replace(':', '-')}.json")
-    with open(record_file, 'w') as f:
-        json.dump(test_record, f, indent=2)
+    # Write test record to file; the epoch-nanosecond suffix is filesystem-safe and sorts chronologically
+    record_file = RECORDS_DIR / f"test_record_{time.time_ns()}.json"
+    write_json_atomic(record_file, test_record)
     
     print(f"Test results recorded to {record_file}")
 
-def main():
+@lru_cache(maxsize=None)
+def build_parser():
+    """Build the command-line parser once; repeated main() calls reuse it"""
     parser = argparse.ArgumentParser(description="Test Runner for Bailian Gateway")
     parser.add_argument("--backend", action="store_true", help="Run backend tests")
     parser.add_argument("--frontend", action="store_true", help="Run frontend tests")
@@ -116,8 +108,12 @@ def main():
     parser.add_argument("--smoke", action="store_true", help="Run smoke tests")
     parser.add_argument("--frontend-accessibility", action="store_true", help="Run frontend accessibility test")
     parser.add_argument("--all", action="store_true", help="Run all tests")
-    
-    args = parser.parse_args()
+    parser.add_argument("--workers", default="auto",
+                        help="Number of pytest-xdist workers for backend tests (default: auto, one per CPU)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
     
     # If no specific tests are requested, run all by default
     if not (args.backend or args.frontend or args.integration or args.smoke or args.frontend_accessibility or args.all):
@@ -131,21 +127,39 @@ def main():
         "frontend_accessibility": None
     }
     
-    # Run requested tests
+    # Collect requested tests; subprocess suites go in jobs, in-process suites in local_jobs
+    jobs = []
+    local_jobs = []
     if args.backend or args.all:
-        results["backend"] = run_backend_tests()
+        jobs.append(("backend", lambda: run_backend_tests(args.workers)))
     
     if args.frontend or args.all:
-        results["frontend"] = run_frontend_tests()
+        jobs.append(("frontend", run_frontend_tests))
     
-    if args.integration or args.all:
-        results["integration"] = run_integration_tests()
+    # Integration tests currently run the backend suite, so reuse its result instead of running it twice
+    run_integration = (args.integration or args.all) and not (args.backend or args.all)
+    if run_integration:
+        jobs.append(("integration", lambda: run_integration_tests(args.workers)))
     
     if args.smoke or args.all:
-        results["smoke"] = run_smoke_tests()
+        local_jobs.append(("smoke", run_smoke_tests))
     
     if args.frontend_accessibility or args.all:
-        results["frontend_accessibility"] = run_frontend_accessibility_test()
+        local_jobs.append(("frontend_accessibility", run_frontend_accessibility_test))
+    
+    # Subprocess suites are independent and prefix their output per line, so run them side by side
+    if jobs:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            future_to_key = {executor.submit(job): key for key, job in jobs}
+            for future in as_completed(future_to_key):
+                results[future_to_key[future]] = future.result()
+    
+    # In-process suites print straight to stdout, so run them afterwards to keep their output readable
+    for key, job in local_jobs:
+        results[key] = job()
+    
+    if (args.integration or args.all) and not run_integration:
+        results["integration"] = results["backend"]
     
     # Record test results
     record_test_results(results)
@@ -5,24 +5,65 @@ Tests: qwen-max, qwen-vl-max, wan2.2-t2i-plus
 """
 
 import pytest
+import base64
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
 import os
-from typing import Dict, Any, List
+import threading
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from json_utils import write_json_atomic
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding/decoding
+    orjson = None
+
+# Decodes response bodies directly from bytes, bypassing requests' stdlib-json Response.json()
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 # Test configuration
 BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 TEST_USERNAME = os.getenv("TEST_USERNAME", "admin")
 TEST_PASSWORD = os.getenv("TEST_PASSWORD", "AdminPass123!")
 
+# Access token reused across runs while it stays valid, so repeated runs skip the login round trip
+TOKEN_CACHE_FILE = Path.home() / ".cache" / "qwen_model_tester" / "token.json"
+TOKEN_MIN_VALIDITY_SECONDS = 60
+
+# Successful model status checks per base URL, reused by testers created within this TTL
+MODEL_STATUS_TTL_SECONDS = 60
+_MODEL_STATUS_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+@lru_cache(maxsize=8)
+def _login(base_url: str, username: str, password: str) -> str:
+    """Log in and return the access token; memoized so testers in one process share a single login"""
+    response = requests.post(f"{base_url}/api/auth/login", json={"username": username, "password": password})
+    if response.status_code != 200:
+        # Raising keeps failed logins out of the cache
+        raise RuntimeError(f"{response.status_code} - {response.text}")
+    return _json_loads(response.content)["data"]["access_token"]
+
 class QwenModelTester:
     """Comprehensive tester for specific Qwen models"""
     
-    def __init__(self):
+    def __init__(self, force_login: bool = False):
         self.base_url = BASE_URL
+        self.force_login = force_login
         self.session = requests.Session()
+        # Model groups and their cases run in parallel, so keep enough warm connections for all of them;
+        # only idempotent GETs are retried on gateway errors
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(
+            total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["GET"]))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.access_token = None
         self.test_results = {
             "timestamp": datetime.now().isoformat(),
@@ -34,32 +75,111 @@ class QwenModelTester:
             "estimated_cost": 0.0,
             "test_details": []
         }
+        # Model groups run in worker threads, so counter updates go through _count under this lock
+        self._lock = threading.Lock()
+        # Serializes re-logins after a 401 so concurrent workers share a single fresh token
+        self._auth_lock = threading.Lock()
     
-    def authenticate(self) -> bool:
-        """Authenticate and get access token"""
-        print("🔐 Authenticating...")
+    def _count(self, **increments):
+        """Add to the shared test_results counters"""
+        with self._lock:
+            for key, value in increments.items():
+                self.test_results[key] += value
+    
+    @staticmethod
+    def _token_expiry(token: str) -> Optional[int]:
+        """Read the exp claim from a JWT payload (the signature is not verified)"""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return int(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+    
+    def _load_cached_token(self) -> Optional[str]:
+        """Return the cached token if it belongs to this backend and user and is not about to expire"""
+        try:
+            cached = json.loads(TOKEN_CACHE_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
         
-        auth_data = {
-            "username": TEST_USERNAME,
-            "password": TEST_PASSWORD
-        }
+        # The file is untrusted: anything that is not a well-formed entry falls through to a normal login
+        if not isinstance(cached, dict):
+            return None
+        if cached.get("base_url") != self.base_url or cached.get("username") != TEST_USERNAME:
+            return None
+        try:
+            if cached.get("exp", 0) - time.time() <= TOKEN_MIN_VALIDITY_SECONDS:
+                return None
+        except TypeError:
+            return None
+        token = cached.get("token")
+        return token if isinstance(token, str) else None
+    
+    def _save_token(self, token: str):
+        """Cache the token and its expiry, readable by the current user only"""
+        exp = self._token_expiry(token)
+        if exp is None:
+            return
         
         try:
-            response = self.session.post(f"{self.base_url}/api/auth/login", json=auth_data)
-            
-            if response.status_code == 200:
-                auth_result = response.json()
-                self.access_token = auth_result["data"]["access_token"]
+            TOKEN_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(TOKEN_CACHE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"base_url": self.base_url, "username": TEST_USERNAME, "token": token, "exp": exp}, f)
+        except OSError as e:
+            print(f"⚠️  Could not cache access token: {e}")
+    
+    def authenticate(self, use_cache: bool = True) -> bool:
+        """Authenticate and get access token"""
+        if use_cache and not self.force_login:
+            cached_token = self._load_cached_token()
+            if cached_token:
+                self.access_token = cached_token
                 self.session.headers.update({"Authorization": f"Bearer {self.access_token}"})
-                print("✅ Authentication successful")
+                print("✅ Reusing cached access token")
                 return True
-            else:
-                print(f"❌ Authentication failed: {response.status_code} - {response.text}")
-                return False
-                
+        
+        print("🔐 Authenticating...")
+        
+        # A forced login bypasses the in-process memo as well as the token file
+        login = _login.__wrapped__ if self.force_login else _login
+        try:
+            self.access_token = login(self.base_url, TEST_USERNAME, TEST_PASSWORD)
+        except RuntimeError as e:
+            print(f"❌ Authentication failed: {e}")
+            return False
         except Exception as e:
             print(f"❌ Authentication error: {str(e)}")
             return False
+        
+        self.session.headers.update({"Authorization": f"Bearer {self.access_token}"})
+        self._save_token(self.access_token)
+        print("✅ Authentication successful")
+        return True
+    
+    def _reauthenticate(self, rejected_token: Optional[str]) -> bool:
+        """Replace an access token the server rejected with one from a fresh login"""
+        with self._auth_lock:
+            if self.access_token != rejected_token:
+                # Another worker already logged in again while this one waited
+                return True
+            
+            print("⚠️  Access token was rejected (401), logging in again")
+            try:
+                TOKEN_CACHE_FILE.unlink()
+            except OSError:
+                pass  # already gone; a successful login rewrites it anyway
+            _login.cache_clear()
+            return self.authenticate(use_cache=False)
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send an authenticated request, logging in again and retrying once if the token is rejected"""
+        token = self.access_token
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code == 401 and self._reauthenticate(token):
+            response = self.session.request(method, url, **kwargs)
+        return response
     
     def test_qwen_max(self) -> Dict[str, Any]:
         """Test Qwen-Max model for advanced reasoning"""
@@ -95,9 +215,7 @@ class QwenModelTester:
             }
         ]
         
-        results = []
-        
-        for test_case in test_cases:
+        def run_case(test_case: Dict[str, Any]) -> Dict[str, Any]:
             print(f"  Testing: {test_case['name']}")
             
             request_data = {
@@ -110,22 +228,20 @@ class QwenModelTester:
             start_time = time.time()
             
             try:
-                response = self.session.post(f"{self.base_url}/api/bailian/chat/completions", json=request_data)
+                response = self._request("POST", f"{self.base_url}/api/bailian/chat/completions", json=request_data)
                 duration = time.time() - start_time
                 
-                self.test_results["total_requests"] += 1
+                self._count(total_requests=1)
                 
                 if response.status_code == 200:
-                    result = response.json()
-                    self.test_results["successful_requests"] += 1
+                    result = _json_loads(response.content)
                     
                     # Extract usage information
                     usage = result.get("usage", {})
                     total_tokens = usage.get("total_tokens", 0)
                     estimated_cost = usage.get("estimated_cost", 0)
                     
-                    self.test_results["total_tokens_used"] += total_tokens
-                    self.test_results["estimated_cost"] += estimated_cost
+                    self._count(successful_requests=1, total_tokens_used=total_tokens, estimated_cost=estimated_cost)
                     
                     test_result = {
                         "test_case": test_case["name"],
@@ -138,11 +254,11 @@ class QwenModelTester:
                         "has_response": bool(result.get("data"))
                     }
                     
-                    results.append(test_result)
-                    print(f"    ✅ Success - {total_tokens} tokens, ${estimated_cost:.4f}")
+                    print(f"    ✅ {test_case['name']} Success - {total_tokens} tokens, ${estimated_cost:.4f}")
+                    return test_result
                     
                 else:
-                    self.test_results["failed_requests"] += 1
+                    self._count(failed_requests=1)
                     test_result = {
                         "test_case": test_case["name"],
                         "status": "FAILED",
@@ -151,11 +267,11 @@ class QwenModelTester:
                         "error": response.text
                     }
                     
-                    results.append(test_result)
-                    print(f"    ❌ Failed - {response.status_code}: {response.text[:100]}")
+                    print(f"    ❌ {test_case['name']} Failed - {response.status_code}: {response.text[:100]}")
+                    return test_result
                     
             except Exception as e:
-                self.test_results["failed_requests"] += 1
+                self._count(failed_requests=1)
                 test_result = {
                     "test_case": test_case["name"],
                     "status": "ERROR",
@@ -163,8 +279,12 @@ class QwenModelTester:
                     "error": str(e)
                 }
                 
-                results.append(test_result)
-                print(f"    ❌ Error - {str(e)}")
+                print(f"    ❌ {test_case['name']} Error - {str(e)}")
+                return test_result
+        
+        # The cases are independent, so their requests are sent in parallel; map keeps the results in case order
+        with ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+            results = list(executor.map(run_case, test_cases))
         
         return {"model": "qwen-max", "results": results}
     
@@ -202,10 +322,9 @@ class QwenModelTester:
             }
         ]
         
-        results = []
-        
-        for test_case in test_cases:
+        def run_case(test_case: Dict[str, Any]) -> List[Dict[str, Any]]:
             print(f"  Testing: {test_case['name']}")
+            case_results = []
             
             # Test both endpoints for qwen-vl-max
             endpoints = [
@@ -224,21 +343,19 @@ class QwenModelTester:
                 start_time = time.time()
                 
                 try:
-                    response = self.session.post(f"{self.base_url}{endpoint['url']}", json=request_data)
+                    response = self._request("POST", f"{self.base_url}{endpoint['url']}", json=request_data)
                     duration = time.time() - start_time
                     
-                    self.test_results["total_requests"] += 1
+                    self._count(total_requests=1)
                     
                     if response.status_code == 200:
-                        result = response.json()
-                        self.test_results["successful_requests"] += 1
+                        result = _json_loads(response.content)
                         
                         usage = result.get("usage", {})
                         total_tokens = usage.get("total_tokens", 0)
                         estimated_cost = usage.get("estimated_cost", 0)
                         
-                        self.test_results["total_tokens_used"] += total_tokens
-                        self.test_results["estimated_cost"] += estimated_cost
+                        self._count(successful_requests=1, total_tokens_used=total_tokens, estimated_cost=estimated_cost)
                         
                         test_result = {
                             "test_case": f"{test_case['name']} - {endpoint['name']}",
@@ -251,11 +368,11 @@ class QwenModelTester:
                             "has_response": bool(result.get("data"))
                         }
                         
-                        results.append(test_result)
-                        print(f"    ✅ {endpoint['name']} Success - {total_tokens} tokens, ${estimated_cost:.4f}")
+                        case_results.append(test_result)
+                        print(f"    ✅ {test_case['name']} - {endpoint['name']} Success - {total_tokens} tokens, ${estimated_cost:.4f}")
                         
                     else:
-                        self.test_results["failed_requests"] += 1
+                        self._count(failed_requests=1)
                         test_result = {
                             "test_case": f"{test_case['name']} - {endpoint['name']}",
                             "status": "FAILED",
@@ -265,11 +382,11 @@ class QwenModelTester:
                             "error": response.text
                         }
                         
-                        results.append(test_result)
-                        print(f"    ❌ {endpoint['name']} Failed - {response.status_code}")
+                        case_results.append(test_result)
+                        print(f"    ❌ {test_case['name']} - {endpoint['name']} Failed - {response.status_code}")
                         
                 except Exception as e:
-                    self.test_results["failed_requests"] += 1
+                    self._count(failed_requests=1)
                     test_result = {
                         "test_case": f"{test_case['name']} - {endpoint['name']}",
                         "status": "ERROR",
@@ -278,8 +395,14 @@ class QwenModelTester:
                         "error": str(e)
                     }
                     
-                    results.append(test_result)
-                    print(f"    ❌ {endpoint['name']} Error - {str(e)}")
+                    case_results.append(test_result)
+                    print(f"    ❌ {test_case['name']} - {endpoint['name']} Error - {str(e)}")
+            
+            return case_results
+        
+        # The cases are independent, so their requests are sent in parallel; map keeps the results in case order
+        with ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+            results = [result for case_results in executor.map(run_case, test_cases) for result in case_results]
         
         return {"model": "qwen-vl-max", "results": results}
     
@@ -317,9 +440,7 @@ class QwenModelTester:
             }
         ]
         
-        results = []
-        
-        for test_case in test_cases:
+        def run_case(test_case: Dict[str, Any]) -> Dict[str, Any]:
             print(f"  Testing: {test_case['name']}")
             
             request_data = {
@@ -331,19 +452,18 @@ class QwenModelTester:
             start_time = time.time()
             
             try:
-                response = self.session.post(f"{self.base_url}/api/bailian/generation", json=request_data)
+                response = self._request("POST", f"{self.base_url}/api/bailian/generation", json=request_data)
                 duration = time.time() - start_time
                 
-                self.test_results["total_requests"] += 1
+                self._count(total_requests=1)
                 
                 if response.status_code == 200:
-                    result = response.json()
-                    self.test_results["successful_requests"] += 1
+                    result = _json_loads(response.content)
                     
                     usage = result.get("usage", {})
                     estimated_cost = usage.get("estimated_cost", 0)
                     
-                    self.test_results["estimated_cost"] += estimated_cost
+                    self._count(successful_requests=1, estimated_cost=estimated_cost)
                     
                     # Check if image generation was successful
                     data = result.get("data", {})
@@ -359,11 +479,11 @@ class QwenModelTester:
                         "prompt_length": len(test_case["prompt"])
                     }
                     
-                    results.append(test_result)
-                    print(f"    ✅ Success - ${estimated_cost:.4f}, Image: {has_image_output}")
+                    print(f"    ✅ {test_case['name']} Success - ${estimated_cost:.4f}, Image: {has_image_output}")
+                    return test_result
                     
                 else:
-                    self.test_results["failed_requests"] += 1
+                    self._count(failed_requests=1)
                     test_result = {
                         "test_case": test_case["name"],
                         "status": "FAILED",
@@ -372,11 +492,11 @@ class QwenModelTester:
                         "error": response.text
                     }
                     
-                    results.append(test_result)
-                    print(f"    ❌ Failed - {response.status_code}")
+                    print(f"    ❌ {test_case['name']} Failed - {response.status_code}")
+                    return test_result
                     
             except Exception as e:
-                self.test_results["failed_requests"] += 1
+                self._count(failed_requests=1)
                 test_result = {
                     "test_case": test_case["name"],
                     "status": "ERROR",
@@ -384,8 +504,12 @@ class QwenModelTester:
                     "error": str(e)
                 }
                 
-                results.append(test_result)
-                print(f"    ❌ Error - {str(e)}")
+                print(f"    ❌ {test_case['name']} Error - {str(e)}")
+                return test_result
+        
+        # The cases are independent, so their requests are sent in parallel; map keeps the results in case order
+        with ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+            results = list(executor.map(run_case, test_cases))
         
         return {"model": "wan2.2-t2i-plus", "results": results}
     
@@ -393,11 +517,16 @@ class QwenModelTester:
         """Test model status and capabilities endpoint"""
         print("\n📊 Testing Model Status Endpoint...")
         
+        cached_at, cached_status = _MODEL_STATUS_CACHE.get(self.base_url, (0.0, None))
+        if cached_status and time.time() - cached_at < MODEL_STATUS_TTL_SECONDS:
+            print("✅ Reusing model status checked in the last minute")
+            return cached_status
+        
         try:
-            response = self.session.get(f"{self.base_url}/api/bailian/models/status")
+            response = self._request("GET", f"{self.base_url}/api/bailian/models/status")
             
             if response.status_code == 200:
-                result = response.json()
+                result = _json_loads(response.content)
                 print("✅ Model status retrieved successfully")
                 
                 # Validate expected models are present
@@ -411,13 +540,15 @@ class QwenModelTester:
                 else:
                     print("✅ All expected models are supported")
                 
-                return {
+                status_result = {
                     "status": "SUCCESS",
                     "supported_models": supported_models,
                     "api_key_configured": result.get("api_key_configured", False),
                     "service_status": result.get("service_status"),
                     "missing_models": missing_models
                 }
+                _MODEL_STATUS_CACHE[self.base_url] = (time.time(), status_result)
+                return status_result
             else:
                 print(f"❌ Model status check failed: {response.status_code}")
                 return {"status": "FAILED", "error": response.text}
@@ -438,10 +569,13 @@ class QwenModelTester:
         # Test model status
         status_result = self.test_model_status()
         
-        # Test each model
-        qwen_max_results = self.test_qwen_max()
-        qwen_vl_results = self.test_qwen_vl_max()
-        wan2_t2i_results = self.test_wan2_t2i_plus()
+        # Test each model; the groups are independent, so their slow inference calls run in parallel
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(test)
+                for test in (self.test_qwen_max, self.test_qwen_vl_max, self.test_wan2_t2i_plus)
+            ]
+            qwen_max_results, qwen_vl_results, wan2_t2i_results = [future.result() for future in futures]
         
         # Compile final results
         self.test_results["models_tested"] = ["qwen-max", "qwen-vl-max", "wan2.2-t2i-plus"]
@@ -483,14 +617,20 @@ class QwenModelTester:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"qwen_models_test_results_{timestamp}.json"
         
-        with open(filename, 'w') as f:
-            json.dump(self.test_results, f, indent=2)
+        write_json_atomic(filename, self.test_results)
         
         print(f"📄 Test results saved to: {filename}")
 
 def main():
     """Main test execution"""
-    tester = QwenModelTester()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Test the qwen-max, qwen-vl-max and wan2.2-t2i-plus models")
+    parser.add_argument("--force-login", action="store_true",
+                        help="Ignore the cached access token and log in again")
+    args = parser.parse_args()
+    
+    tester = QwenModelTester(force_login=args.force_login)
     results = tester.run_comprehensive_test()
     tester.save_results()
     
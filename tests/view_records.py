@@ -6,26 +6,34 @@ Test Record Viewer for Alibaba Cloud Bailian API Integration Platform
 import os
 import json
 import argparse
+import heapq
 from datetime import datetime
+from pathlib import Path
 
-def list_test_records():
-    """List all test records"""
-    records_dir = os.path.join(os.getcwd(), "test_records")
-    if not os.path.exists(records_dir):
+# Records are written by test_runner.py relative to the directory the tests are run from
+RECORDS_DIR = Path("test_records")
+
+def list_test_records(limit=None):
+    """List test records, newest first; only the `limit` most recent are read when given"""
+    if not RECORDS_DIR.is_dir():
         print("No test records found.")
         return
     
-    records = []
-    for filename in os.listdir(records_dir):
-        if filename.endswith(".json"):
-            filepath = os.path.join(records_dir, filename)
-            with open(filepath, 'r') as f:
-                record = json.load(f)
-                record['filename'] = filename
-                records.append(record)
+    # Order by modification time from the directory scan so only the records to be shown are parsed
+    with os.scandir(RECORDS_DIR) as it:
+        entries = [entry for entry in it if entry.name.endswith(".json")]
+    mtime = lambda entry: entry.stat().st_mtime
+    if limit is not None:
+        entries = heapq.nlargest(limit, entries, key=mtime)
+    else:
+        entries.sort(key=mtime, reverse=True)
     
-    # Sort records by timestamp
-    records.sort(key=lambda x: x['timestamp'], reverse=True)
+    records = []
+    for entry in entries:
+        with open(entry.path, 'r') as f:
+            record = json.load(f)
+            record['filename'] = entry.name
+            records.append(record)
     
     print("Test Records:")
     print("-" * 80)
@@ -45,10 +53,9 @@ def list_test_records():
 
 def view_test_record(filename):
     """View a specific test record"""
-    records_dir = os.path.join(os.getcwd(), "test_records")
-    filepath = os.path.join(records_dir, filename)
+    filepath = RECORDS_DIR / filename
     
-    if not os.path.exists(filepath):
+    if not filepath.exists():
         print(f"Test record {filename} not found.")
         return
     
@@ -70,13 +77,14 @@ def main():
     parser = argparse.ArgumentParser(description="Test Record Viewer for Bailian Gateway")
     parser.add_argument("--list", action="store_true", help="List all test records")
     parser.add_argument("--view", type=str, help="View a specific test record")
+    parser.add_argument("--limit", type=int, help="Only list the N most recent test records")
     
     args = parser.parse_args()
     
     if args.view:
         view_test_record(args.view)
     else:
-        list_test_records()
+        list_test_records(args.limit)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file